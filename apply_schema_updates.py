@@ -1,4 +1,7 @@
+import hashlib
 import logging
+import re
+import time
 from utils.database import Database
 from psycopg2 import Error as PostgresError
 
@@ -11,14 +14,15 @@ def split_sql_commands(sql_file):
     with open(sql_file, 'r') as f:
         sql_content = f.read()
     
-    # Split on semicolons while ignoring those within comments
+    # Split on semicolons while ignoring those within comments and $$-quoted bodies
     commands = []
     current_command = []
     in_comment = False
+    in_dollar_quote = False
     
     for line in sql_content.split('\n'):
         line = line.strip()
-        if not line or line.startswith('--'):
+        if not line or (line.startswith('--') and not in_dollar_quote):
             continue
             
         if line.startswith('/*'):
@@ -31,14 +35,89 @@ def split_sql_commands(sql_file):
             
         if not in_comment:
             current_command.append(line)
-            if line.endswith(';'):
+            # Function bodies contain semicolons that do not end the statement
+            if line.count('$$') % 2 == 1:
+                in_dollar_quote = not in_dollar_quote
+            if line.endswith(';') and not in_dollar_quote:
                 commands.append('\n'.join(current_command))
                 current_command = []
     
     return commands
 
+# Files that existing databases already received before the migration ledger
+BASELINE_FILES = [
+    'schema.sql',
+    'schema_updates_email.sql',
+    'schema_updates_scraping.sql',
+    'schema_updates_interview.sql',
+    'schema_updates_optimization.sql',
+    'sample_job_sources.sql',
+    'sample_interview_questions.sql'
+]
+
+# Serializes migration runs across every app instance sharing the database
+MIGRATION_LOCK_KEY = 'apply_schema_updates'
+
+# Single DDL statements whose "already exists" error is safe to skip; a DO
+# block is never skipped, since that would roll back everything else it did
+SKIPPABLE_DDL = re.compile(r'^\s*(CREATE|ALTER|COMMENT)\b', re.IGNORECASE)
+
+def file_checksum(sql_file):
+    """SHA-256 of a migration file, recorded in the ledger when it is applied"""
+    with open(sql_file, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def ensure_migration_ledger(cur):
+    """Create the schema_migrations ledger and baseline pre-ledger databases"""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            filename VARCHAR(255) PRIMARY KEY,
+            checksum CHAR(64) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            execution_ms INTEGER
+        )
+    """)
+    cur.execute("""
+        SELECT NOT EXISTS (SELECT 1 FROM schema_migrations)
+               AND to_regclass('public.jobs') IS NOT NULL
+    """)
+    if cur.fetchone()[0]:
+        # The schema predates the ledger; record the files it was built from
+        logger.info("Existing schema found, recording baseline migrations")
+        for sql_file in BASELINE_FILES:
+            cur.execute("""
+                INSERT INTO schema_migrations (filename, checksum)
+                VALUES (%s, %s)
+                ON CONFLICT (filename) DO NOTHING
+            """, (sql_file, file_checksum(sql_file)))
+
+def apply_migration(connection, sql_file, checksum):
+    """Apply one file and record it in the ledger, all in a single transaction"""
+    started = time.monotonic()
+    with connection.cursor() as cur:
+        # Pooled connections carry the app's statement_timeout; backfills must not hit it
+        cur.execute("SET LOCAL statement_timeout = 0")
+        for command in split_sql_commands(sql_file):
+            if not command.strip():
+                continue
+            # Objects created by hand are tolerated without aborting the file
+            cur.execute("SAVEPOINT migration_command")
+            try:
+                cur.execute(command)
+            except PostgresError as e:
+                if 'already exists' not in str(e) or not SKIPPABLE_DDL.match(command):
+                    raise
+                logger.info(f"Object already exists, skipping: {str(e).strip()}")
+                cur.execute("ROLLBACK TO SAVEPOINT migration_command")
+            else:
+                cur.execute("RELEASE SAVEPOINT migration_command")
+        cur.execute("""
+            INSERT INTO schema_migrations (filename, checksum, execution_ms)
+            VALUES (%s, %s, %s)
+        """, (sql_file, checksum, int((time.monotonic() - started) * 1000)))
+
 def apply_schema_updates():
-    """Apply database schema updates with error handling"""
+    """Apply pending schema migrations recorded in the schema_migrations ledger"""
     db = Database()
     sql_files = [
         'schema.sql',
@@ -46,33 +125,50 @@ def apply_schema_updates():
         'schema_updates_scraping.sql',
         'schema_updates_interview.sql',
         'schema_updates_optimization.sql',
+        'schema_updates_uploads.sql',
+        'schema_updates_ingestion.sql',
+        'schema_updates_search.sql',
+        'schema_updates_pagination.sql',
+        'schema_updates_analytics.sql',
+        'schema_updates_cache.sql',
+        'schema_updates_partitioning.sql',
+        'schema_updates_trigram.sql',
+        'schema_updates_skill_trends.sql',
+        'schema_updates_job_keys.sql',
+        'schema_updates_match_cache.sql',
         'sample_job_sources.sql',
         'sample_interview_questions.sql'
     ]
     
     connection = None
+    locked = False
     try:
         connection = db.get_connection()
+        with connection.cursor() as cur:
+            # Session lock: other instances wait here, then find nothing left to do
+            cur.execute("SELECT pg_advisory_lock(hashtext(%s))", (MIGRATION_LOCK_KEY,))
+            locked = True
+            ensure_migration_ledger(cur)
+            cur.execute("SELECT filename, checksum FROM schema_migrations")
+            applied = dict(cur.fetchall())
+        connection.commit()
+        
         for sql_file in sql_files:
-            logger.info(f"Processing schema updates from {sql_file}")
-            commands = split_sql_commands(sql_file)
+            checksum = file_checksum(sql_file)
+            if sql_file in applied:
+                if applied[sql_file].strip() != checksum:
+                    logger.warning(f"{sql_file} changed after it was applied; add a new migration file instead")
+                continue
             
-            for command in commands:
-                if not command.strip():
-                    continue
-                    
-                try:
-                    with connection.cursor() as cur:
-                        cur.execute(command)
-                        connection.commit()
-                        logger.info(f"Successfully executed command: {command[:50]}...")
-                except PostgresError as e:
-                    if 'already exists' in str(e):
-                        logger.info(f"Table already exists, skipping: {str(e)}")
-                        connection.rollback()
-                        continue
-                    logger.error(f"Error executing command: {str(e)}")
-                    connection.rollback()
+            logger.info(f"Applying schema updates from {sql_file}")
+            try:
+                apply_migration(connection, sql_file, checksum)
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                logger.error(f"Error applying {sql_file}: {str(e)}")
+                # Later files may depend on this one
+                raise
                     
         logger.info("Schema updates completed successfully")
         
@@ -83,7 +179,13 @@ def apply_schema_updates():
         raise
     finally:
         if connection:
-            connection.commit()
+            if locked:
+                try:
+                    with connection.cursor() as cur:
+                        cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (MIGRATION_LOCK_KEY,))
+                    connection.commit()
+                except Exception as e:
+                    logger.error(f"Error releasing migration lock: {str(e)}")
             db.return_connection(connection)
 
 if __name__ == "__main__":
@@ -3,17 +3,54 @@ import plotly.graph_objects as go
 import plotly.express as px
 from utils.database import Database
 from datetime import datetime, timedelta
+import os
 import pandas as pd
-from collections import Counter
+
+# ANALYTICS_SOURCE=snapshot reads global aggregates from the Parquet snapshots;
+# pyarrow is only imported when it is set
+ANALYTICS_SOURCE = os.environ.get('ANALYTICS_SOURCE', 'database')
+
+def get_job_trends_from_snapshot():
+    """Daily job counts for the last 30 days from the jobs snapshot, or None"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    from utils.snapshot_exporter import load_snapshot
+    cutoff = datetime.combine(datetime.now().date() - timedelta(days=30), datetime.min.time())
+    # Only the posted_at column of recent month partitions is read
+    table = load_snapshot(
+        'jobs',
+        columns=['posted_at'],
+        filter=(ds.field('month') >= cutoff.strftime('%Y-%m')) &
+               (ds.field('posted_at') >= pa.scalar(cutoff, type=pa.timestamp('us')))
+    )
+    if table is None:
+        return None
+    days = pa.table({'post_date': pc.cast(table['posted_at'], pa.date32())})
+    counts = days.group_by('post_date').aggregate([('post_date', 'count')]).sort_by('post_date')
+    return counts['post_date'].to_pylist(), counts['post_date_count'].to_pylist()
+
+def get_location_distribution_from_snapshot():
+    """Top 10 job locations from the jobs snapshot, or None"""
+    from utils.snapshot_exporter import load_snapshot
+    table = load_snapshot('jobs', columns=['location'])
+    if table is None:
+        return None
+    counts = table.group_by('location').aggregate([('location', 'count')])
+    top = counts.sort_by([('location_count', 'descending')]).slice(0, 10)
+    return list(zip(top['location'].to_pylist(), top['location_count'].to_pylist()))
 
 def get_job_trends(db):
     """Get job posting trends over time"""
-    with db.conn.cursor() as cur:
+    if ANALYTICS_SOURCE == 'snapshot':
+        trends = get_job_trends_from_snapshot()
+        if trends is not None:
+            return trends
+    with db.get_cursor(readonly=True) as cur:
         cur.execute("""
-            SELECT DATE(posted_at) as post_date, COUNT(*) as job_count
-            FROM jobs
-            WHERE posted_at >= CURRENT_DATE - INTERVAL '30 days'
-            GROUP BY DATE(posted_at)
+            SELECT post_date, job_count
+            FROM analytics_job_daily_counts
+            WHERE post_date >= CURRENT_DATE - INTERVAL '30 days'
             ORDER BY post_date
         """)
         data = cur.fetchall()
@@ -23,19 +60,22 @@ def get_job_trends(db):
 
 def get_location_distribution(db):
     """Get job distribution by location"""
-    with db.conn.cursor() as cur:
+    if ANALYTICS_SOURCE == 'snapshot':
+        locations = get_location_distribution_from_snapshot()
+        if locations is not None:
+            return locations
+    with db.get_cursor(readonly=True) as cur:
         cur.execute("""
-            SELECT location, COUNT(*) as count
-            FROM jobs
-            GROUP BY location
-            ORDER BY count DESC
+            SELECT location, job_count
+            FROM analytics_location_counts
+            ORDER BY job_count DESC
             LIMIT 10
         """)
         return cur.fetchall()
 
 def get_match_score_distribution(db, user_id):
     """Get distribution of match scores"""
-    with db.conn.cursor() as cur:
+    with db.get_cursor(readonly=True) as cur:
         cur.execute("""
             SELECT 
                 CASE 
@@ -55,57 +95,21 @@ def get_match_score_distribution(db, user_id):
 
 def get_user_activity(db, user_id):
     """Get user activity metrics"""
-    with db.conn.cursor() as cur:
-        # Get total viewed jobs (matches)
-        cur.execute("""
-            SELECT COUNT(*) FROM job_matches WHERE user_id = %s
-        """, (user_id,))
-        total_matches = cur.fetchone()[0]
-        
-        # Get bookmarked jobs
-        cur.execute("""
-            SELECT COUNT(*) FROM bookmarks WHERE user_id = %s
-        """, (user_id,))
-        bookmarked = cur.fetchone()[0]
-        
-        # Get average match score
-        cur.execute("""
-            SELECT AVG(match_score) FROM job_matches WHERE user_id = %s
-        """, (user_id,))
-        avg_match = cur.fetchone()[0] or 0
-        
-        return {
-            'total_matches': total_matches,
-            'bookmarked': bookmarked,
-            'avg_match': round(avg_match, 2)
-        }
+    return db.get_user_activity(user_id)
 
 def get_skill_trends(db):
     """Get trending skills from job descriptions"""
-    with db.conn.cursor() as cur:
+    with db.get_cursor(readonly=True) as cur:
+        # Daily per-skill counts are maintained as jobs are inserted
         cur.execute("""
-            SELECT description
-            FROM jobs
-            WHERE posted_at >= CURRENT_DATE - INTERVAL '30 days'
+            SELECT skill, SUM(job_count) AS job_count
+            FROM job_skill_daily
+            WHERE day >= CURRENT_DATE - INTERVAL '30 days'
+            GROUP BY skill
+            ORDER BY job_count DESC
+            LIMIT 10
         """)
-        descriptions = cur.fetchall()
-        
-        # Common technical skills to look for
-        skills = [
-            'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node',
-            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'ci/cd', 'devops',
-            'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'redis',
-            'machine learning', 'ai', 'data science', 'tensorflow', 'pytorch'
-        ]
-        
-        skill_counts = Counter()
-        for desc in descriptions:
-            desc_lower = desc[0].lower()
-            for skill in skills:
-                if skill in desc_lower:
-                    skill_counts[skill] += 1
-                    
-        return skill_counts.most_common(10)
+        return cur.fetchall()
 
 def render_analytics_dashboard():
     st.header("Analytics Dashboard")
@@ -127,6 +131,12 @@ def render_analytics_dashboard():
     
     # Job Posting Trends
     st.subheader("Job Posting Trends (Last 30 Days)")
+    snapshot_time = None
+    if ANALYTICS_SOURCE == 'snapshot':
+        from utils.snapshot_exporter import get_snapshot_time
+        snapshot_time = get_snapshot_time('jobs')
+    if snapshot_time:
+        st.caption(f"Job statistics as of {snapshot_time:%Y-%m-%d %H:%M}")
     dates, counts = get_job_trends(db)
     if dates:
         fig = go.Figure()
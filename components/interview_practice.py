@@ -1,18 +1,33 @@
+import os
 import streamlit as st
 from utils.database import Database
-from utils.interview_db import InterviewDB
+from utils.interview_db import InterviewDB, create_question_pool
 from utils.ai_feedback import AIFeedback
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
+# Questions offered per page load, drawn at random from the matching ones
+QUESTION_SAMPLE_SIZE = 50
+
+# The question bank is held in memory and reloaded in the background
+@st.cache_resource
+def get_question_pool():
+    pool = create_question_pool(
+        Database(),
+        refresh_interval=int(os.environ.get('QUESTION_POOL_REFRESH_INTERVAL', 600)),
+        max_size=int(os.environ.get('QUESTION_POOL_MAX_SIZE', 10000))
+    )
+    pool.start()
+    return pool
+
 def get_relevant_questions(interview_db, user_skills):
     """Get questions matching user's skills with relevance scoring"""
     # Get questions matching user's skills
     questions = interview_db.get_questions_by_skills(
         skills=list(user_skills),
-        limit=None  # Get all matching questions
+        limit=QUESTION_SAMPLE_SIZE
     )
     
     # Score questions by skill relevance
@@ -103,7 +118,7 @@ def render_interview_practice():
         
     # Initialize database connections
     db = Database()
-    interview_db = InterviewDB(db)
+    interview_db = InterviewDB(db, get_question_pool())
     ai_feedback = AIFeedback()
     
     # Get user ID from session state
@@ -151,12 +166,14 @@ def render_interview_practice():
                 st.info("No skill-specific questions found. Showing general questions.")
                 questions = interview_db.get_questions(
                     category=None if category == "All" else category,
-                    difficulty=None if difficulty == "All" else difficulty
+                    difficulty=None if difficulty == "All" else difficulty,
+                    limit=QUESTION_SAMPLE_SIZE
                 )
         else:
             questions = interview_db.get_questions(
                 category=None if category == "All" else category,
-                difficulty=None if difficulty == "All" else difficulty
+                difficulty=None if difficulty == "All" else difficulty,
+                limit=QUESTION_SAMPLE_SIZE
             )
         
         if not questions:
@@ -356,20 +373,13 @@ def render_interview_practice():
     else:  # Review Previous Responses
         st.markdown("### Previous Response Review")
         
-        # Get user's response history
-        responses = interview_db.get_user_responses(user_id)
-        
-        if not responses:
-            st.info("No previous responses found. Start practicing to build your history!")
-            return
-        
         # Show response history with filters
         date_filter = st.selectbox(
             "Time Period",
             ["All Time", "Last Week", "Last Month", "Last 3 Months"]
         )
         
-        filtered_responses = responses
+        cutoff = None
         if date_filter != "All Time":
             days = {
                 "Last Week": 7,
@@ -377,9 +387,11 @@ def render_interview_practice():
                 "Last 3 Months": 90
             }[date_filter]
             cutoff = datetime.now() - timedelta(days=days)
-            filtered_responses = [r for r in responses if r['created_at'] > cutoff]
         
-        for response in filtered_responses:
+        # Responses are streamed from the database and rendered as they arrive
+        shown = 0
+        for response in interview_db.get_user_responses(user_id, since=cutoff):
+            shown += 1
             with st.expander(
                 f"{response['category'].title()} - {response['score']}% - "
                 f"{response['created_at'].strftime('%Y-%m-%d %H:%M')}"
@@ -389,6 +401,13 @@ def render_interview_practice():
                     st.markdown(f"**Related Skills:** {', '.join(response['skill_tags'])}")
                 st.markdown(f"**Your Response:** {response['response']}")
                 st.markdown(f"**Feedback:** {response['ai_feedback']}")
+        
+        if not shown:
+            if cutoff is None:
+                st.info("No previous responses found. Start practicing to build your history!")
+                return
+            # Older history still counts towards the progress charts below
+            st.info("No responses in this time period.")
     
     # Show progress
     st.markdown("---")
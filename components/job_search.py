@@ -1,9 +1,14 @@
+import os
 import streamlit as st
 from utils.database import Database
+from utils.autocomplete import Autocomplete
 from utils.advanced_matcher import AdvancedMatcher
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+# Match counts above this are shown as "10,000+" until the user asks for the exact figure
+SEARCH_COUNT_CAP = 10000
+
 # Cache the database connection
 @st.cache_resource
 def get_db():
@@ -14,31 +19,41 @@ def get_db():
 def get_matcher():
     return AdvancedMatcher()
 
-# Cache common queries
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def perform_search(query, location, country, page=1, per_page=10):
-    db = get_db()
-    offset = (page - 1) * per_page
+# Title/company suggestions are answered from memory and rebuilt in the background
+@st.cache_resource
+def get_autocomplete():
+    autocomplete = Autocomplete(
+        get_db().get_autocomplete_terms,
+        refresh_interval=int(os.environ.get('AUTOCOMPLETE_REFRESH_INTERVAL', 600))
+    )
+    autocomplete.start()
+    return autocomplete
+
+def get_filter_location(location, country):
     filter_location = location
-    
     if country and country != "Any Location":
         if filter_location:
             filter_location = f"{filter_location}, {country}"
         else:
             filter_location = country
-            
-    return db.get_jobs(query, filter_location, limit=per_page, offset=offset)
+    return filter_location
 
-@st.cache_data(ttl=300)
-def get_total_jobs(query, location, country):
+# Results are cached in Database and evicted when jobs change
+def perform_search(query, location, country, cursor=None, per_page=10, fuzzy=False):
+    """Fetch one page of results; the first page also carries a capped match count"""
     db = get_db()
-    filter_location = location
-    if country and country != "Any Location":
-        if filter_location:
-            filter_location = f"{filter_location}, {country}"
-        else:
-            filter_location = country
-    return db.get_total_jobs(query, filter_location)
+    return db.get_jobs(
+        query,
+        get_filter_location(location, country),
+        limit=per_page,
+        cursor=cursor,
+        count_cap=SEARCH_COUNT_CAP if cursor is None else None,
+        fuzzy=fuzzy
+    )
+
+def get_total_jobs(query, location, country, fuzzy=False):
+    db = get_db()
+    return db.get_total_jobs(query, get_filter_location(location, country), fuzzy)
 
 def display_job_card(job):
     with st.expander(f"{job['title']} - {job['company']}"):
@@ -110,15 +125,30 @@ def display_job_card(job):
             if st.button("Save Job", key=f"save_{job['id']}"):
                 with st.spinner("Saving job..."):
                     db = get_db()
-                    db.save_bookmark(st.session_state['user_id'], job['id'])
-                    st.success("Job saved to bookmarks!")
+                    if db.save_bookmark(st.session_state['user_id'], job['id']):
+                        st.success("Job saved to bookmarks!")
+                    else:
+                        st.info("This job is already in your bookmarks or is no longer listed.")
 
-def display_job_results(jobs, total_jobs, current_page, per_page):
+def display_job_results(jobs, total_jobs, total_is_exact, current_page, per_page, next_cursor):
     if not jobs:
         st.info("No jobs found matching your criteria. Try adjusting your filters.")
         return
     
-    st.write(f"Found {total_jobs} matching jobs")
+    if total_is_exact:
+        st.write(f"Found {total_jobs:,} matching jobs")
+    else:
+        st.write(f"Found {total_jobs:,}+ matching jobs")
+        # Exact counts over broad matches are expensive, so only run them on request
+        if st.button("Count all matches", key="exact_count"):
+            st.session_state.search_total = get_total_jobs(
+                st.session_state.search_query,
+                st.session_state.selected_location,
+                st.session_state.selected_country,
+                st.session_state.get('search_fuzzy', False)
+            )
+            st.session_state.search_total_is_exact = True
+            st.experimental_rerun()
     
     # Display results with progress bar
     with st.progress(0) as progress_bar:
@@ -126,38 +156,48 @@ def display_job_results(jobs, total_jobs, current_page, per_page):
             display_job_card(job)
             progress_bar.progress((i + 1) / len(jobs))
     
-    # Pagination controls
-    total_pages = (total_jobs + per_page - 1) // per_page
+    # Pagination controls: each page is fetched by seeking past the previous one
+    total_pages = max((total_jobs + per_page - 1) // per_page, 1)
+    total_pages_label = f"{total_pages:,}" if total_is_exact else f"{total_pages:,}+"
     col1, col2, col3 = st.columns([1, 2, 1])
     
+    with col1:
+        if current_page > 1 and st.button("Previous", key="page_prev"):
+            st.session_state.page_cursors.pop()
+            st.experimental_rerun()
+    
     with col2:
-        pages = []
-        if current_page > 1:
-            pages.append(current_page - 1)
-        pages.append(current_page)
-        if current_page < total_pages:
-            pages.append(current_page + 1)
-            
-        page_buttons = st.columns(len(pages))
-        for i, page in enumerate(pages):
-            with page_buttons[i]:
-                if st.button(
-                    f"Page {page}",
-                    key=f"page_{page}",
-                    type="primary" if page == current_page else "secondary"
-                ):
-                    st.session_state.current_page = page
-                    st.experimental_rerun()
+        st.write(f"Page {current_page} of {total_pages_label}")
+    
+    with col3:
+        if next_cursor and st.button("Next", key="page_next"):
+            st.session_state.page_cursors.append(next_cursor)
+            st.experimental_rerun()
 
 def render_job_search():
     st.header("Job Search")
     
-    # Initialize session state
-    if 'current_page' not in st.session_state:
-        st.session_state.current_page = 1
+    # Initialize session state; page_cursors holds the opaque cursor of each visited page
+    if 'page_cursors' not in st.session_state:
+        st.session_state.page_cursors = [None]
     if 'per_page' not in st.session_state:
         st.session_state.per_page = 10
     
+    # Type-ahead: suggest titles and companies for what has been typed so far
+    prefix = st.text_input("Look up a job title or company", key="typeahead_prefix")
+    suggestions = get_autocomplete().suggest(prefix) if prefix else []
+    if suggestions:
+        columns = st.columns(min(len(suggestions), 4))
+        for i, suggestion in enumerate(suggestions):
+            if columns[i % len(columns)].button(suggestion, key=f"suggestion_{i}"):
+                st.session_state.page_cursors = [None]
+                st.session_state.search_total_is_exact = False
+                st.session_state.search_query = suggestion
+                st.session_state.search_fuzzy = False
+                st.session_state.setdefault('selected_location', '')
+                st.session_state.setdefault('selected_country', 'Any Location')
+                st.experimental_rerun()
+    
     # Create form for search filters
     with st.form(key='search_form'):
         col1, col2, col3 = st.columns(3)
@@ -183,37 +223,47 @@ def render_job_search():
                 index=countries.index(st.session_state.get('selected_country', 'Any Location'))
             )
         
+        fuzzy = st.checkbox(
+            "Typo-tolerant title/company match",
+            value=st.session_state.get('search_fuzzy', False)
+        )
+        
         # Add search button
         search_submitted = st.form_submit_button("Search Jobs")
         
         if search_submitted:
-            # Reset pagination on new search
-            st.session_state.current_page = 1
+            # Reset pagination and counts on new search
+            st.session_state.page_cursors = [None]
+            st.session_state.search_total_is_exact = False
             # Update search parameters
             st.session_state.search_query = search_query
             st.session_state.selected_location = location
             st.session_state.selected_country = country
+            st.session_state.search_fuzzy = fuzzy
     
     # Show loading skeleton while fetching results
     if hasattr(st.session_state, 'search_query'):
         with st.spinner("Fetching job results..."):
-            total_jobs = get_total_jobs(
-                st.session_state.search_query,
-                st.session_state.selected_location,
-                st.session_state.selected_country
-            )
-            
-            jobs = perform_search(
+            results = perform_search(
                 st.session_state.search_query,
                 st.session_state.selected_location,
                 st.session_state.selected_country,
-                st.session_state.current_page,
-                st.session_state.per_page
+                st.session_state.page_cursors[-1],
+                st.session_state.per_page,
+                st.session_state.get('search_fuzzy', False)
             )
             
+            # Only the first page counts matches; later pages reuse its total
+            if results['total'] is not None:
+                if not st.session_state.get('search_total_is_exact') or results['total_is_exact']:
+                    st.session_state.search_total = results['total']
+                    st.session_state.search_total_is_exact = results['total_is_exact']
+            
             display_job_results(
-                jobs,
-                total_jobs,
-                st.session_state.current_page,
-                st.session_state.per_page
+                results['jobs'],
+                st.session_state.get('search_total', 0),
+                st.session_state.get('search_total_is_exact', True),
+                len(st.session_state.page_cursors),
+                st.session_state.per_page,
+                results['next_cursor']
             )
@@ -1,107 +1,20 @@
 import streamlit as st
-from utils.nlp_processor import NLPProcessor
 from utils.database import Database
 from utils.file_handler import FileHandler
-import io
 import logging
-import time
-from typing import Tuple, Optional
-import math
-import magic
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Cache expensive operations with proper TTL
-@st.cache_resource(ttl=3600)
-def get_nlp_processor():
-    return NLPProcessor()
-
 @st.cache_resource(ttl=3600)
 def get_db():
     return Database()
 
-@st.cache_data(ttl=3600, max_entries=50)
-def cache_file_content(file_content: bytes, file_name: str) -> str:
-    """Cache file content with a unique key"""
-    return f"{file_name}_{hash(file_content)}"
-
-@st.cache_data(ttl=3600)
-def extract_text_from_file(file_content: bytes, file_type: str) -> Tuple[Optional[str], Optional[str]]:
-    """Extract text from file with optimized chunked processing and caching"""
-    try:
-        # Process in chunks with a progress bar
-        chunk_size = 1024 * 1024  # 1MB chunks
-        total_size = len(file_content)
-        chunks = math.ceil(total_size / chunk_size)
-        
-        extracted_text = ""
-        for i in range(chunks):
-            start = i * chunk_size
-            end = min((i + 1) * chunk_size, total_size)
-            chunk = file_content[start:end]
-            
-            # Process chunk based on file type
-            if file_type == 'pdf':
-                text_chunk = process_pdf_chunk(io.BytesIO(chunk))
-            else:  # docx
-                text_chunk = process_docx_chunk(io.BytesIO(chunk))
-            
-            extracted_text += text_chunk
-            
-        if not extracted_text.strip():
-            return None, f"Could not extract text from {file_type.upper()} file."
-            
-        return extracted_text, None
-            
-    except Exception as e:
-        logger.error(f"Error processing {file_type} file: {str(e)}")
-        return None, f"Error processing file: {str(e)}"
-
-@st.cache_data(ttl=3600)
-def process_pdf_chunk(chunk):
-    """Process a chunk of PDF data with caching"""
-    try:
-        import PyPDF2
-        pdf_reader = PyPDF2.PdfReader(chunk)
-        return " ".join(page.extract_text() for page in pdf_reader.pages)
-    except Exception as e:
-        logger.error(f"Error processing PDF chunk: {str(e)}")
-        return ""
-
-@st.cache_data(ttl=3600)
-def process_docx_chunk(chunk):
-    """Process a chunk of DOCX data with caching"""
-    try:
-        from docx import Document
-        doc = Document(chunk)
-        return " ".join(paragraph.text for paragraph in doc.paragraphs)
-    except Exception as e:
-        logger.error(f"Error processing DOCX chunk: {str(e)}")
-        return ""
-
-@st.cache_data(ttl=3600)
-def validate_file_type(file_content: bytes, filename: str) -> Tuple[bool, Optional[str]]:
-    """Validate file type using magic numbers with caching"""
-    try:
-        mime_type = magic.from_buffer(file_content, mime=True)
-        allowed_mime_types = {
-            'application/pdf': '.pdf',
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx'
-        }
-        
-        file_ext = filename.lower().split('.')[-1]
-        if mime_type not in allowed_mime_types:
-            return False, "Invalid file type. Please upload a PDF or DOCX file."
-            
-        if allowed_mime_types[mime_type] != f'.{file_ext}':
-            return False, "File extension does not match the actual file type."
-            
-        return True, None
-    except Exception as e:
-        logger.error(f"Error validating file type: {str(e)}")
-        return False, f"Error validating file: {str(e)}"
+@st.cache_resource(ttl=3600)
+def get_file_handler():
+    return FileHandler()
 
 def render_resume_preview(resume_text: str, container) -> None:
     """Render resume preview with optimized state management and chunking"""
@@ -222,6 +135,40 @@ def render_resume_preview(resume_text: str, container) -> None:
         logger.error(f"Error in resume preview: {str(e)}")
         container.error("Error displaying preview. Please try again.")
 
+def apply_processed_resume(file_key: str, resume_text: str, skills) -> None:
+    """Store a processed resume in session state for the other pages"""
+    st.session_state.upload_state.update({
+        'file_key': file_key,
+        'job_id': None,
+        'resume_text': resume_text,
+        'processing_complete': True,
+        'error': None
+    })
+    st.session_state.resume_text = resume_text
+    st.session_state.skills = set(skills or [])
+
+@st.fragment(run_every=2)
+def render_ingestion_status() -> None:
+    """Poll the background ingestion job until the resume is ready"""
+    upload_state = st.session_state.upload_state
+    job_id = upload_state.get('job_id')
+    if not job_id:
+        return
+
+    job = get_db().get_resume_ingestion_job(job_id)
+    if not job:
+        st.error("Could not load the status of your upload. Please try again.")
+        return
+
+    if job['status'] == 'done':
+        apply_processed_resume(upload_state['pending_file_key'], job['resume_text'], job['skills'])
+        st.rerun()
+    elif job['status'] == 'failed':
+        upload_state.update({'job_id': None, 'pending_file_key': None, 'error': job['error']})
+        st.error(job['error'] or "Failed to process resume")
+    else:
+        st.info(f"Processing {job['file_name']}... (job #{job_id}, {job['status']})")
+
 def render_resume_upload():
     """Main resume upload handler with optimized state management"""
     st.header("Resume Upload")
@@ -230,6 +177,8 @@ def render_resume_upload():
     if 'upload_state' not in st.session_state:
         st.session_state.upload_state = {
             'file_key': None,
+            'pending_file_key': None,
+            'job_id': None,
             'resume_text': None,
             'processing_complete': False,
             'error': None
@@ -247,75 +196,88 @@ def render_resume_upload():
         
         if submit and uploaded_file:
             try:
-                # Check if this is a new file using cached content
-                current_file_key = cache_file_content(uploaded_file.getvalue(), uploaded_file.name)
+                # One zero-copy view of the upload is shared by validation, hashing and saving
+                file_handler = get_file_handler()
+                file_buffer = uploaded_file.getbuffer()
                 
-                if current_file_key != st.session_state.upload_state['file_key']:
-                    # Validate file
-                    is_valid, error = validate_file_type(
-                        uploaded_file.getvalue(),
-                        uploaded_file.name
-                    )
-                    
-                    if not is_valid:
-                        st.error(error)
-                        return
+                # Identify the file by content so re-uploads skip all processing
+                current_file_key = file_handler.compute_hash(file_buffer)
+                
+                if current_file_key not in (st.session_state.upload_state['file_key'],
+                                            st.session_state.upload_state['pending_file_key']):
+                    db = get_db()
+                    user_id = st.session_state.get('user_id', 1)
+                    existing = db.get_resume_by_hash(current_file_key)
                     
-                    # Process file with progress tracking
-                    with st.spinner("Processing resume..."):
-                        # Extract text
-                        file_type = uploaded_file.name.split('.')[-1].lower()
-                        resume_text, error = extract_text_from_file(
-                            uploaded_file.getvalue(),
-                            file_type
+                    if existing:
+                        # Known file: link to the stored copy and extracted features
+                        resume_id = db.save_resume(
+                            user_id,
+                            existing['resume_text'],
+                            existing['skills'],
+                            existing['location'],
+                            existing['file_path'],
+                            existing['file_type'],
+                            content_hash=current_file_key
+                        )
+                        
+                        if not resume_id:
+                            st.error("Failed to save resume to database")
+                            return
+                        
+                        apply_processed_resume(
+                            current_file_key,
+                            existing['resume_text'],
+                            existing['skills']
+                        )
+                        st.success("Resume processed successfully!")
+                    else:
+                        # Validate file from its leading bytes before writing it
+                        is_valid, error = file_handler.validate_buffer(
+                            file_buffer,
+                            uploaded_file.name
+                        )
+                        
+                        if not is_valid:
+                            st.error(error)
+                            return
+                        
+                        file_path, error = file_handler.save_buffer(
+                            file_buffer,
+                            uploaded_file.name,
+                            content_hash=current_file_key
                         )
                         
                         if error:
                             st.error(error)
                             return
                         
-                        # Process with NLP (cached)
-                        nlp = get_nlp_processor()
-                        with st.spinner("Analyzing resume content..."):
-                            processed_data = nlp.process_text(resume_text)
-                            
-                        # Save to database
-                        db = get_db()
-                        file_handler = FileHandler()
+                        # Parsing and NLP run on the ingestion workers
+                        job_id = db.enqueue_resume_ingestion(
+                            user_id,
+                            uploaded_file.name,
+                            file_path,
+                            uploaded_file.name.split('.')[-1].lower(),
+                            current_file_key
+                        )
                         
-                        with st.spinner("Saving resume..."):
-                            file_path = file_handler.save_file(uploaded_file)
-                            resume_id = db.save_resume(
-                                st.session_state.get('user_id', 1),
-                                resume_text,
-                                list(processed_data['skills']),
-                                processed_data['location'],
-                                file_path,
-                                file_type
-                            )
-                            
-                            if not resume_id:
-                                st.error("Failed to save resume to database")
-                                return
+                        if not job_id:
+                            st.error("Failed to queue resume for processing")
+                            return
                         
-                        # Update session state
                         st.session_state.upload_state.update({
-                            'file_key': current_file_key,
-                            'resume_text': resume_text,
-                            'processing_complete': True,
+                            'pending_file_key': current_file_key,
+                            'job_id': job_id,
                             'error': None
                         })
                         
-                        st.session_state.resume_text = resume_text
-                        st.session_state.skills = processed_data['skills']
-                        
-                        st.success("Resume processed successfully!")
-                        
             except Exception as e:
                 logger.error(f"Error processing resume: {str(e)}")
                 st.error(f"Error processing resume: {str(e)}")
                 return
     
+    render_ingestion_status()
+    
     # Show preview if processing is complete
     if st.session_state.upload_state['processing_complete']:
         st.subheader("Resume Preview")
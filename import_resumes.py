@@ -0,0 +1,193 @@
+import argparse
+import hashlib
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+from utils.database import Database
+from utils.file_handler import FileHandler
+from utils.nlp_processor import NLPProcessor
+from utils.resume_parser import extract_text
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+# Parse jobs kept in flight per worker; bounds memory regardless of directory size
+JOBS_PER_WORKER = 4
+# Log throughput after this many parsed files
+PROGRESS_EVERY = 100
+
+# Per-process state for the parse workers
+_file_handler = None
+_nlp = None
+
+def init_parse_worker():
+    """Create the file handler and NLP processor once per worker process"""
+    global _file_handler, _nlp
+    _file_handler = FileHandler()
+    _nlp = NLPProcessor()
+
+def find_resume_files(directory: str, file_handler: FileHandler) -> List[str]:
+    """Recursively collect PDF and DOCX files under a directory"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if file_handler.allowed_file(name):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+def hash_file(path: str) -> str:
+    """Compute a file's SHA-256 without loading it into memory"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def parse_resume_file(path: str, content_hash: str) -> Tuple[str, Optional[Dict], Optional[str]]:
+    """Validate, store and parse one resume file; runs in a worker process"""
+    try:
+        with open(path, "rb") as f:
+            buffer = memoryview(f.read())
+
+        name = os.path.basename(path)
+        is_valid, error = _file_handler.validate_buffer(buffer, name)
+        if not is_valid:
+            return path, None, error
+
+        file_path, error = _file_handler.save_buffer(buffer, name, content_hash)
+        if error:
+            return path, None, error
+
+        file_type = name.rsplit('.', 1)[1].lower()
+        with _file_handler.open_file(file_path) as f:
+            resume_text, error = extract_text(f, file_type)
+        if error:
+            return path, None, error
+
+        processed_data = _nlp.process_text(resume_text)
+        return path, {
+            'resume_text': resume_text,
+            'skills': list(processed_data['skills']),
+            'location': processed_data['location'],
+            'file_path': file_path,
+            'file_type': file_type,
+            'content_hash': content_hash,
+            'size': len(buffer)
+        }, None
+    except Exception as e:
+        return path, None, str(e)
+
+def import_resumes(directory: str, user_id: int, workers: int, batch_size: int) -> Dict[str, int]:
+    """Import every resume under a directory, skipping duplicate content"""
+    db = Database()
+    file_handler = FileHandler()
+    started = time.monotonic()
+    stats = {'found': 0, 'duplicates': 0, 'imported': 0, 'failed': 0, 'bytes': 0}
+
+    paths = find_resume_files(directory, file_handler)
+    stats['found'] = len(paths)
+    logger.info(f"Found {len(paths)} resume files under {directory}")
+
+    # Dedupe within the directory, then against resumes already stored
+    unique_files = {}
+    for path in paths:
+        content_hash = hash_file(path)
+        if content_hash in unique_files:
+            stats['duplicates'] += 1
+        else:
+            unique_files[content_hash] = path
+
+    existing = set()
+    hashes = list(unique_files)
+    for i in range(0, len(hashes), batch_size):
+        existing |= db.get_existing_content_hashes(hashes[i:i + batch_size])
+    stats['duplicates'] += len(existing)
+    pending = [(path, h) for h, path in unique_files.items() if h not in existing]
+    logger.info(f"{len(pending)} new files to parse, {stats['duplicates']} duplicates skipped")
+
+    def flush(batch):
+        stats['imported'] += db.save_resumes_batch(batch)
+        batch.clear()
+
+    def log_progress(parsed):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        logger.info(
+            f"Progress: {parsed}/{len(pending)} files parsed, {stats['imported']} imported, "
+            f"{parsed / elapsed:.1f} files/s, {stats['bytes'] / elapsed / 1024 / 1024:.2f} MB/s"
+        )
+
+    # Workers are spawned so they never inherit the parent's pooled connections
+    batch = []
+    parsed = 0
+    queued = iter(pending)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=init_parse_worker
+    ) as executor:
+        # Only a window of jobs is submitted at a time and refilled as they finish
+        in_flight = set()
+        for path, h in queued:
+            in_flight.add(executor.submit(parse_resume_file, path, h))
+            if len(in_flight) >= workers * JOBS_PER_WORKER:
+                break
+        while in_flight:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                next_file = next(queued, None)
+                if next_file is not None:
+                    in_flight.add(executor.submit(parse_resume_file, *next_file))
+
+                path, resume, error = future.result()
+                parsed += 1
+                if parsed % PROGRESS_EVERY == 0:
+                    log_progress(parsed)
+                if error:
+                    logger.warning(f"Skipping {path}: {error}")
+                    stats['failed'] += 1
+                    continue
+
+                stats['bytes'] += resume['size']
+                batch.append((
+                    user_id,
+                    resume['resume_text'],
+                    resume['skills'],
+                    resume['location'],
+                    resume['file_path'],
+                    resume['file_type'],
+                    resume['content_hash']
+                ))
+                if len(batch) >= batch_size:
+                    flush(batch)
+            # Finished futures hold the parsed text; let them go once their rows are batched
+            finished = future = resume = None
+
+    if batch:
+        flush(batch)
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"Imported {stats['imported']} resumes in {elapsed:.1f}s "
+        f"({stats['duplicates']} duplicates, {stats['failed']} failed)"
+    )
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import PDF/DOCX resumes from a directory")
+    parser.add_argument("directory", help="Directory to scan recursively for resumes")
+    parser.add_argument("--user-id", type=int, default=1, help="User that owns the imported resumes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of parse processes")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="Rows per multi-row INSERT")
+    args = parser.parse_args()
+
+    import_resumes(args.directory, args.user_id, args.workers, args.batch_size)
+
+if __name__ == "__main__":
+    main()
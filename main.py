@@ -17,9 +17,13 @@ from components.interview_practice import render_interview_practice
 from utils.database import Database
 from utils.notification_worker import setup_notification_worker
 from utils.scraping_worker import setup_scraping_worker
+from utils.ingestion_worker import setup_ingestion_worker
+from utils.archival_worker import setup_archival_worker
+from utils.analytics_worker import setup_analytics_worker
 from utils.nlp_processor import NLPProcessor
 from apply_schema_updates import apply_schema_updates
 import logging
+import os
 from typing import Optional
 
 # Configure logging
@@ -61,6 +65,17 @@ def initialize_components():
         try:
             setup_notification_worker()
             setup_scraping_worker()
+            # Set INGESTION_WORKERS=0 when running `python -m utils.ingestion_worker` separately
+            ingestion_workers = int(os.environ.get('INGESTION_WORKERS', 2))
+            if ingestion_workers > 0:
+                setup_ingestion_worker(ingestion_workers)
+            setup_archival_worker()
+            setup_analytics_worker()
+            # Parquet snapshots for the dashboard and offline analysis; 0 disables
+            snapshot_interval = int(os.environ.get('ANALYTICS_SNAPSHOT_INTERVAL', 24 * 3600))
+            if snapshot_interval > 0:
+                from utils.snapshot_exporter import setup_snapshot_worker
+                setup_snapshot_worker(snapshot_interval)
         except Exception as e:
             logger.error(f"Worker initialization error: {str(e)}")
             st.warning("Background workers failed to start but application can continue.")
@@ -118,6 +133,10 @@ def render_app():
         # Initialize session state
         if 'user_id' not in st.session_state:
             st.session_state['user_id'] = 1  # Default user for demo
+        # Reruns run on fresh threads; keep this user's reads on the primary after their writes
+        db = get_db()
+        if db:
+            db.bind_session(st.session_state['user_id'])
         if 'page' not in st.session_state:
             st.session_state['page'] = "Upload Resume"
         if 'error_boundary' not in st.session_state:
@@ -157,40 +176,64 @@ def render_app():
                 with st.spinner("Loading saved jobs..."):
                     st.header("Saved Jobs")
                     
-                    # Lazy load bookmarked jobs
-                    if 'bookmarked_jobs' not in st.session_state:
-                        db = get_db()
-                        if db:
-                            st.session_state.bookmarked_jobs = db.get_bookmarks(
-                                st.session_state['user_id']
-                            )
+                    # Fetch only the current page; bookmark_cursors holds the cursor of each visited page
+                    if 'bookmark_cursors' not in st.session_state:
+                        st.session_state.bookmark_cursors = [None]
+                    
+                    bookmarked_jobs, next_cursor = [], None
+                    db = get_db()
+                    if db:
+                        bookmarked_jobs, next_cursor = db.get_bookmarks(
+                            st.session_state['user_id'],
+                            limit=5,
+                            cursor=st.session_state.bookmark_cursors[-1]
+                        )
                     
-                    bookmarked_jobs = st.session_state.get('bookmarked_jobs', [])
                     if not bookmarked_jobs:
                         st.info("No saved jobs found. Start bookmarking jobs you're interested in!")
                     else:
-                        # Show jobs with pagination
-                        jobs_per_page = 5
-                        total_pages = (len(bookmarked_jobs) + jobs_per_page - 1) // jobs_per_page
-                        
-                        page_num = st.selectbox(
-                            "Page", 
-                            range(1, total_pages + 1),
-                            key="bookmarks_page"
-                        )
-                        
-                        start_idx = (page_num - 1) * jobs_per_page
-                        end_idx = start_idx + jobs_per_page
-                        
-                        for job in bookmarked_jobs[start_idx:end_idx]:
+                        for job in bookmarked_jobs:
+                            if job['is_archived']:
+                                with st.expander("Archived job posting"):
+                                    st.info("This posting has expired and was moved to the archive.")
+                                    if st.button("Remove", key=f"bookmark_remove_{job['id']}"):
+                                        db.delete_bookmark(st.session_state['user_id'], job['id'])
+                                        st.session_state.bookmark_cursors = [None]
+                                        st.experimental_rerun()
+                                continue
                             with st.expander(f"{job['title']} - {job['company']}"):
                                 st.write(f"**Location:** {job['location']}")
-                                st.write(f"**Description:**\n{job['description']}")
+                                if job['match_score'] is not None:
+                                    st.write(f"**Match Score:** {job['match_score']:.0f}%")
+                                
+                                # The list carries an excerpt; the full text is fetched on request
+                                show_full = job['is_truncated'] and st.checkbox(
+                                    "Show full description", key=f"bookmark_desc_{job['id']}"
+                                )
+                                description = db.get_job_description(job['id']) if show_full else None
+                                st.write(f"**Description:**\n{description or job['excerpt']}")
                                 
                                 # Show match score if resume is uploaded
-                                if 'resume_text' in st.session_state:
+                                if 'resume_text' in st.session_state and (description or not job['is_truncated']):
                                     with st.spinner("Calculating match score..."):
-                                        render_match_visualization(job['description'])
+                                        render_match_visualization(description or job['excerpt'])
+                                
+                                if st.button("Remove", key=f"bookmark_remove_{job['id']}"):
+                                    db.delete_bookmark(st.session_state['user_id'], job['id'])
+                                    st.session_state.bookmark_cursors = [None]
+                                    st.experimental_rerun()
+                        
+                        col1, col2, col3 = st.columns([1, 2, 1])
+                        with col1:
+                            if len(st.session_state.bookmark_cursors) > 1 and st.button("Previous", key="bookmarks_prev"):
+                                st.session_state.bookmark_cursors.pop()
+                                st.experimental_rerun()
+                        with col2:
+                            st.write(f"Page {len(st.session_state.bookmark_cursors)}")
+                        with col3:
+                            if next_cursor and st.button("Next", key="bookmarks_next"):
+                                st.session_state.bookmark_cursors.append(next_cursor)
+                                st.experimental_rerun()
 
             # Footer
             st.sidebar.markdown("---")
@@ -0,0 +1,41 @@
+-- Global dashboard aggregates, refreshed CONCURRENTLY by the analytics worker
+
+-- Jobs posted per day
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics_job_daily_counts AS
+SELECT DATE(posted_at) AS post_date, COUNT(*) AS job_count
+FROM jobs
+WHERE posted_at IS NOT NULL
+GROUP BY DATE(posted_at);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_job_daily_counts_date
+ON analytics_job_daily_counts(post_date);
+
+-- Jobs per location
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics_location_counts AS
+SELECT location, COUNT(*) AS job_count
+FROM jobs
+WHERE location IS NOT NULL
+GROUP BY location;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_location_counts_location
+ON analytics_location_counts(location);
+
+CREATE INDEX IF NOT EXISTS idx_analytics_location_counts_count
+ON analytics_location_counts(job_count DESC);
+
+-- Mentions of tracked skills in job descriptions from the last 30 days
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics_skill_counts AS
+SELECT s.skill, COUNT(j.id) AS job_count
+FROM unnest(ARRAY[
+    'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'ci/cd', 'devops',
+    'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'redis',
+    'machine learning', 'ai', 'data science', 'tensorflow', 'pytorch'
+]) AS s(skill)
+LEFT JOIN jobs j
+    ON j.posted_at >= CURRENT_DATE - INTERVAL '30 days'
+    AND position(s.skill IN lower(j.description)) > 0
+GROUP BY s.skill;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_skill_counts_skill
+ON analytics_skill_counts(skill);
@@ -0,0 +1,44 @@
+-- Change notifications for the query result cache in utils/query_cache.py
+-- Payload is the table name, or "table:user_id" for per-user tables
+
+CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('table_changes', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_user_row_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('table_changes', TG_TABLE_NAME || ':' || OLD.user_id);
+    ELSE
+        PERFORM pg_notify('table_changes', TG_TABLE_NAME || ':' || NEW.user_id);
+        IF TG_OP = 'UPDATE' AND OLD.user_id IS DISTINCT FROM NEW.user_id THEN
+            PERFORM pg_notify('table_changes', TG_TABLE_NAME || ':' || OLD.user_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Scraping writes jobs in bulk, so notify once per statement
+DROP TRIGGER IF EXISTS trg_jobs_notify_change ON jobs;
+CREATE TRIGGER trg_jobs_notify_change
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON jobs
+FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+DROP TRIGGER IF EXISTS trg_bookmarks_notify_change ON bookmarks;
+CREATE TRIGGER trg_bookmarks_notify_change
+AFTER INSERT OR UPDATE OR DELETE ON bookmarks
+FOR EACH ROW EXECUTE FUNCTION notify_user_row_change();
+
+DROP TRIGGER IF EXISTS trg_bookmarks_truncate_notify ON bookmarks;
+CREATE TRIGGER trg_bookmarks_truncate_notify
+AFTER TRUNCATE ON bookmarks
+FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+DROP TRIGGER IF EXISTS trg_email_preferences_notify_change ON email_preferences;
+CREATE TRIGGER trg_email_preferences_notify_change
+AFTER INSERT OR UPDATE OR DELETE ON email_preferences
+FOR EACH ROW EXECUTE FUNCTION notify_user_row_change();
@@ -0,0 +1,21 @@
+-- Queue of uploaded resumes waiting to be parsed by the ingestion workers
+CREATE TABLE IF NOT EXISTS resume_ingestion_jobs (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(id),
+    file_name VARCHAR(255) NOT NULL,
+    file_path VARCHAR(1024) NOT NULL,
+    file_type VARCHAR(10) NOT NULL,
+    content_hash CHAR(64) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'processing', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    resume_id INTEGER REFERENCES resumes(id),
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Workers only ever scan pending jobs
+CREATE INDEX IF NOT EXISTS idx_resume_ingestion_jobs_pending
+ON resume_ingestion_jobs(status, created_at)
+WHERE status IN ('queued', 'processing');
@@ -0,0 +1,107 @@
+-- Job ids as a plain keyed table. Bookmarks and matches reference it, since a
+-- foreign key into partitioned jobs would need posted_at as well, and it maps an
+-- id to its posted_at so lookups by id prune to one partition.
+-- Row triggers on the partitioned jobs table require PostgreSQL 13+.
+
+CREATE TABLE IF NOT EXISTS job_ids (
+    id INTEGER PRIMARY KEY,
+    posted_at TIMESTAMP NOT NULL,
+    -- Set when the job's partition is moved to jobs_archive
+    archived_at TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION job_ids_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO job_ids (id, posted_at)
+    VALUES (NEW.id, NEW.posted_at)
+    ON CONFLICT (id) DO UPDATE SET posted_at = EXCLUDED.posted_at, archived_at = NULL;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- An UPDATE that changes posted_at moves the row between partitions as a
+-- delete plus an insert, so only drop the key once the id is really gone
+CREATE OR REPLACE FUNCTION job_ids_delete() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('jobs.moving_partition', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM jobs WHERE id = OLD.id) THEN
+        DELETE FROM job_ids WHERE id = OLD.id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_jobs_job_ids_insert ON jobs;
+CREATE TRIGGER trg_jobs_job_ids_insert
+AFTER INSERT ON jobs
+FOR EACH ROW EXECUTE FUNCTION job_ids_insert();
+
+DROP TRIGGER IF EXISTS trg_jobs_job_ids_delete ON jobs;
+CREATE TRIGGER trg_jobs_job_ids_delete
+AFTER DELETE ON jobs
+FOR EACH ROW EXECUTE FUNCTION job_ids_delete();
+
+-- Rows moved out of jobs_default into a new partition are not deleted jobs
+CREATE OR REPLACE FUNCTION create_jobs_partition(month_start DATE) RETURNS TEXT AS $$
+DECLARE
+    partition_name TEXT := 'jobs_' || to_char(month_start, 'YYYY_MM');
+    month_end DATE := (month_start + INTERVAL '1 month')::date;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL
+       OR to_regclass('jobs_archive.' || partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE jobs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name);
+    PERFORM set_config('jobs.moving_partition', 'on', true);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM jobs_default WHERE posted_at >= %L AND posted_at < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        month_start, month_end, partition_name
+    );
+    PERFORM set_config('jobs.moving_partition', 'off', true);
+    EXECUTE format('ALTER TABLE jobs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   partition_name, month_start, month_end);
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill live jobs, then jobs already moved to the archive schema
+INSERT INTO job_ids (id, posted_at)
+SELECT id, posted_at FROM jobs
+ON CONFLICT (id) DO NOTHING;
+
+DO $$
+DECLARE
+    archived RECORD;
+BEGIN
+    FOR archived IN
+        SELECT c.relname FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'jobs_archive' AND c.relkind = 'r' AND c.relname ~ '^jobs_[0-9]{4}_[0-9]{2}$'
+    LOOP
+        EXECUTE format(
+            'INSERT INTO job_ids (id, posted_at, archived_at) '
+            'SELECT id, posted_at, CURRENT_TIMESTAMP FROM jobs_archive.%I '
+            'ON CONFLICT (id) DO NOTHING',
+            archived.relname
+        );
+    END LOOP;
+END;
+$$;
+
+-- Rows pointing at jobs that no longer exist anywhere cannot be shown
+DELETE FROM bookmarks b WHERE NOT EXISTS (SELECT 1 FROM job_ids k WHERE k.id = b.job_id);
+DELETE FROM job_matches m WHERE NOT EXISTS (SELECT 1 FROM job_ids k WHERE k.id = m.job_id);
+
+ALTER TABLE bookmarks DROP CONSTRAINT IF EXISTS bookmarks_job_id_fkey;
+ALTER TABLE bookmarks ADD CONSTRAINT bookmarks_job_id_fkey
+    FOREIGN KEY (job_id) REFERENCES job_ids(id) ON DELETE CASCADE;
+
+ALTER TABLE job_matches DROP CONSTRAINT IF EXISTS job_matches_job_id_fkey;
+ALTER TABLE job_matches ADD CONSTRAINT job_matches_job_id_fkey
+    FOREIGN KEY (job_id) REFERENCES job_ids(id) ON DELETE CASCADE;
+
+-- Lookups by id now go through job_ids and the (id, posted_at) primary key
+DROP INDEX IF EXISTS idx_jobs_id;
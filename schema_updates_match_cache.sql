@@ -0,0 +1,13 @@
+-- Bookmarks pages carry the user's match score, so match changes must evict
+-- them from the query result cache; notify_user_row_change comes from
+-- schema_updates_cache.sql
+
+DROP TRIGGER IF EXISTS trg_job_matches_notify_change ON job_matches;
+CREATE TRIGGER trg_job_matches_notify_change
+AFTER INSERT OR UPDATE OR DELETE ON job_matches
+FOR EACH ROW EXECUTE FUNCTION notify_user_row_change();
+
+DROP TRIGGER IF EXISTS trg_job_matches_truncate_notify ON job_matches;
+CREATE TRIGGER trg_job_matches_truncate_notify
+AFTER TRUNCATE ON job_matches
+FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
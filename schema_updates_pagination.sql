@@ -0,0 +1,5 @@
+-- Keyset pagination: newest-first job listing when no keywords are given
+CREATE INDEX IF NOT EXISTS idx_jobs_sort_at ON jobs ((COALESCE(posted_at, created_at)) DESC, id DESC);
+
+-- Keyset pagination: a user's bookmarks, newest first
+CREATE INDEX IF NOT EXISTS idx_bookmarks_user_created ON bookmarks(user_id, created_at DESC, id DESC);
@@ -0,0 +1,161 @@
+-- Partition jobs by posted_at month so queries prune to recent postings
+-- and expired months can be detached and archived (see Database.archive_job_partitions)
+
+CREATE SCHEMA IF NOT EXISTS jobs_archive;
+
+-- (source_id, external_id) dedupe moves here: a unique index on a
+-- partitioned table would have to include posted_at
+CREATE TABLE IF NOT EXISTS job_external_keys (
+    source_id INTEGER NOT NULL,
+    external_id VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (source_id, external_id)
+);
+
+-- Create the partition for one month, moving any rows that already
+-- landed in the default partition into it
+CREATE OR REPLACE FUNCTION create_jobs_partition(month_start DATE) RETURNS TEXT AS $$
+DECLARE
+    partition_name TEXT := 'jobs_' || to_char(month_start, 'YYYY_MM');
+    month_end DATE := (month_start + INTERVAL '1 month')::date;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL
+       OR to_regclass('jobs_archive.' || partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE jobs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM jobs_default WHERE posted_at >= %L AND posted_at < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved',
+        month_start, month_end, partition_name
+    );
+    EXECUTE format('ALTER TABLE jobs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   partition_name, month_start, month_end);
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Make sure partitions exist from the current month through months_ahead
+CREATE OR REPLACE FUNCTION ensure_jobs_partitions(months_ahead INTEGER) RETURNS INTEGER AS $$
+DECLARE
+    month_start DATE := date_trunc('month', CURRENT_DATE)::date;
+    i INTEGER;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        PERFORM create_jobs_partition((month_start + make_interval(months => i))::date);
+    END LOOP;
+    RETURN months_ahead + 1;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Convert the existing table once; reruns find it already partitioned
+DO $$
+DECLARE
+    first_month DATE;
+    month_start DATE;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('jobs')) THEN
+        RETURN;
+    END IF;
+
+    -- Dependent views are recreated below
+    DROP MATERIALIZED VIEW IF EXISTS analytics_job_daily_counts;
+    DROP MATERIALIZED VIEW IF EXISTS analytics_location_counts;
+    DROP MATERIALIZED VIEW IF EXISTS analytics_skill_counts;
+
+    -- Foreign keys cannot reference a partitioned table by id alone
+    ALTER TABLE bookmarks DROP CONSTRAINT IF EXISTS bookmarks_job_id_fkey;
+    ALTER TABLE job_matches DROP CONSTRAINT IF EXISTS job_matches_job_id_fkey;
+
+    ALTER TABLE jobs RENAME TO jobs_unpartitioned;
+    ALTER TABLE jobs_unpartitioned RENAME CONSTRAINT jobs_pkey TO jobs_unpartitioned_pkey;
+    ALTER SEQUENCE jobs_id_seq OWNED BY NONE;
+
+    UPDATE jobs_unpartitioned
+    SET posted_at = COALESCE(created_at, CURRENT_TIMESTAMP)
+    WHERE posted_at IS NULL;
+
+    INSERT INTO job_external_keys (source_id, external_id)
+    SELECT DISTINCT source_id, external_id
+    FROM jobs_unpartitioned
+    WHERE source_id IS NOT NULL AND external_id IS NOT NULL
+    ON CONFLICT DO NOTHING;
+
+    CREATE TABLE jobs (LIKE jobs_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (posted_at);
+    ALTER TABLE jobs ALTER COLUMN posted_at SET DEFAULT CURRENT_TIMESTAMP;
+    ALTER TABLE jobs ALTER COLUMN posted_at SET NOT NULL;
+    ALTER TABLE jobs ADD PRIMARY KEY (id, posted_at);
+    ALTER TABLE jobs ADD FOREIGN KEY (source_id) REFERENCES job_sources(id);
+    ALTER SEQUENCE jobs_id_seq OWNED BY jobs.id;
+
+    CREATE TABLE jobs_default PARTITION OF jobs DEFAULT;
+
+    SELECT date_trunc('month', MIN(posted_at))::date INTO first_month FROM jobs_unpartitioned;
+    month_start := COALESCE(first_month, date_trunc('month', CURRENT_DATE)::date);
+    WHILE month_start <= date_trunc('month', CURRENT_DATE)::date LOOP
+        PERFORM create_jobs_partition(month_start);
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+    PERFORM ensure_jobs_partitions(3);
+
+    INSERT INTO jobs SELECT * FROM jobs_unpartitioned;
+    DROP TABLE jobs_unpartitioned;
+END;
+$$;
+
+-- Indexes on the parent are created on every partition
+CREATE INDEX IF NOT EXISTS idx_jobs_id ON jobs(id);
+CREATE INDEX IF NOT EXISTS idx_jobs_posted_at ON jobs(posted_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs(location);
+CREATE INDEX IF NOT EXISTS idx_jobs_title ON jobs(title);
+CREATE INDEX IF NOT EXISTS idx_jobs_search_vector ON jobs USING gin(search_vector);
+-- posted_at is now always set, so the newest-first listing sorts on it directly
+CREATE INDEX IF NOT EXISTS idx_jobs_sort_at ON jobs(posted_at DESC, id DESC);
+
+DROP TRIGGER IF EXISTS trg_jobs_search_vector ON jobs;
+CREATE TRIGGER trg_jobs_search_vector
+BEFORE INSERT OR UPDATE OF title, company, description ON jobs
+FOR EACH ROW EXECUTE FUNCTION jobs_search_vector_update();
+
+DROP TRIGGER IF EXISTS trg_jobs_notify_change ON jobs;
+CREATE TRIGGER trg_jobs_notify_change
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON jobs
+FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change();
+
+-- Analytics views dropped by the conversion
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics_job_daily_counts AS
+SELECT DATE(posted_at) AS post_date, COUNT(*) AS job_count
+FROM jobs
+WHERE posted_at IS NOT NULL
+GROUP BY DATE(posted_at);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_job_daily_counts_date
+ON analytics_job_daily_counts(post_date);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics_location_counts AS
+SELECT location, COUNT(*) AS job_count
+FROM jobs
+WHERE location IS NOT NULL
+GROUP BY location;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_location_counts_location
+ON analytics_location_counts(location);
+
+CREATE INDEX IF NOT EXISTS idx_analytics_location_counts_count
+ON analytics_location_counts(job_count DESC);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics_skill_counts AS
+SELECT s.skill, COUNT(j.id) AS job_count
+FROM unnest(ARRAY[
+    'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'ci/cd', 'devops',
+    'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'redis',
+    'machine learning', 'ai', 'data science', 'tensorflow', 'pytorch'
+]) AS s(skill)
+LEFT JOIN jobs j
+    ON j.posted_at >= CURRENT_DATE - INTERVAL '30 days'
+    AND position(s.skill IN lower(j.description)) > 0
+GROUP BY s.skill;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_skill_counts_skill
+ON analytics_skill_counts(skill);
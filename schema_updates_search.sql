@@ -0,0 +1,30 @@
+-- Weighted full-text search document for each job: title (A), company (B), description (C)
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+CREATE OR REPLACE FUNCTION jobs_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.company, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+-- Keep the search document current on every write
+DROP TRIGGER IF EXISTS trg_jobs_search_vector ON jobs;
+CREATE TRIGGER trg_jobs_search_vector
+BEFORE INSERT OR UPDATE OF title, company, description ON jobs
+FOR EACH ROW EXECUTE FUNCTION jobs_search_vector_update();
+
+-- Backfill existing rows
+UPDATE jobs SET search_vector =
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(company, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'C')
+WHERE search_vector IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_jobs_search_vector ON jobs USING gin(search_vector);
+
+-- Superseded by idx_jobs_search_vector, which also covers title and company
+DROP INDEX IF EXISTS idx_jobs_description_gin;
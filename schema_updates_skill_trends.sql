@@ -0,0 +1,53 @@
+-- Skills counted by the Trending Skills chart
+CREATE TABLE IF NOT EXISTS tracked_skills (
+    skill VARCHAR(100) PRIMARY KEY
+);
+
+INSERT INTO tracked_skills (skill)
+SELECT unnest(ARRAY[
+    'python', 'java', 'javascript', 'react', 'angular', 'vue', 'node',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'ci/cd', 'devops',
+    'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'redis',
+    'machine learning', 'ai', 'data science', 'tensorflow', 'pytorch'
+])
+ON CONFLICT DO NOTHING;
+
+-- Jobs posted per day whose description mentions each tracked skill
+CREATE TABLE IF NOT EXISTS job_skill_daily (
+    day DATE NOT NULL,
+    skill VARCHAR(100) NOT NULL,
+    job_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, skill)
+);
+
+-- Incremented once per INSERT statement from the batch of new rows
+CREATE OR REPLACE FUNCTION jobs_skill_daily_update() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO job_skill_daily (day, skill, job_count)
+    SELECT n.posted_at::date, s.skill, COUNT(*)
+    FROM new_jobs n
+    JOIN tracked_skills s ON position(s.skill IN lower(n.description)) > 0
+    GROUP BY n.posted_at::date, s.skill
+    ON CONFLICT (day, skill) DO UPDATE
+    SET job_count = job_skill_daily.job_count + EXCLUDED.job_count;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_jobs_skill_daily ON jobs;
+CREATE TRIGGER trg_jobs_skill_daily
+AFTER INSERT ON jobs
+REFERENCING NEW TABLE AS new_jobs
+FOR EACH STATEMENT EXECUTE FUNCTION jobs_skill_daily_update();
+
+-- Backfill from the jobs already stored
+INSERT INTO job_skill_daily (day, skill, job_count)
+SELECT j.posted_at::date, s.skill, COUNT(*)
+FROM jobs j
+JOIN tracked_skills s ON position(s.skill IN lower(j.description)) > 0
+GROUP BY j.posted_at::date, s.skill
+ON CONFLICT (day, skill) DO UPDATE
+SET job_count = EXCLUDED.job_count;
+
+-- Replaced by job_skill_daily
+DROP MATERIALIZED VIEW IF EXISTS analytics_skill_counts;
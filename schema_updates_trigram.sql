@@ -0,0 +1,8 @@
+-- Typo-tolerant title/company search (Database.get_jobs with fuzzy=True)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_jobs_title_trgm ON jobs USING gin(title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_jobs_company_trgm ON jobs USING gin(company gin_trgm_ops);
+
+-- Superseded by idx_jobs_title_trgm, which also serves substring and similarity matches
+DROP INDEX IF EXISTS idx_jobs_title;
@@ -0,0 +1,7 @@
+-- Track where each resume file is stored and its content hash
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS location TEXT;
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS file_path VARCHAR(1024);
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS content_hash CHAR(64);
+
+-- Look up previously processed uploads by content hash
+CREATE INDEX IF NOT EXISTS idx_resumes_content_hash ON resumes(content_hash);
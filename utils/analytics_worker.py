@@ -0,0 +1,36 @@
+import logging
+import os
+import threading
+import time
+from utils.database import Database
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def refresh_analytics():
+    """Refresh the materialized views that back the analytics dashboard"""
+    return Database().refresh_analytics_views()
+
+def setup_analytics_worker():
+    """
+    Set up the analytics view refresh worker to run periodically
+    """
+    interval = int(os.environ.get('ANALYTICS_REFRESH_INTERVAL', 900))
+
+    def worker():
+        logger.info("Starting analytics refresh worker")
+        while True:
+            try:
+                refresh_analytics()
+            except Exception as e:
+                logger.error(f"Critical error in analytics refresh worker: {str(e)}")
+            finally:
+                time.sleep(interval)
+    
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    logger.info("Analytics refresh worker initialized")
+
+if __name__ == "__main__":
+    refresh_analytics()
@@ -0,0 +1,71 @@
+import logging
+import os
+import threading
+import time
+from utils.file_handler import FileHandler
+from utils.database import Database
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def get_archive_settings():
+    """Read upload archival settings from the environment"""
+    max_age_days = int(os.environ.get('UPLOAD_ARCHIVE_AGE_DAYS', 30))
+    retention_days = os.environ.get('UPLOAD_RETENTION_DAYS')
+    return max_age_days, int(retention_days) if retention_days else None
+
+def run_upload_compaction():
+    """
+    Compress old uploads and report how much disk space was reclaimed
+    """
+    max_age_days, retention_days = get_archive_settings()
+    referenced_paths = None
+    if retention_days is not None:
+        referenced_paths = Database().get_referenced_upload_paths()
+        if referenced_paths is None:
+            # Without the references any deletion could orphan a resume
+            logger.warning("Could not load referenced uploads, skipping retention this run")
+            retention_days = None
+    report = FileHandler().archive_old_files(max_age_days, retention_days, referenced_paths)
+    logger.info(
+        f"Upload compaction archived {report['files_archived']} files, "
+        f"deleted {report['files_deleted']}, kept {report['files_retained']} still referenced, "
+        f"reclaimed {report['reclaimed_bytes']} bytes ({report['errors']} errors)"
+    )
+    return report
+
+def run_job_partition_maintenance():
+    """
+    Create upcoming jobs partitions and archive expired ones
+    """
+    db = Database()
+    months_ahead = int(os.environ.get('JOBS_PARTITION_MONTHS_AHEAD', 3))
+    max_age_days = int(os.environ.get('JOBS_ARCHIVE_AFTER_DAYS', 180))
+    db.ensure_job_partitions(months_ahead)
+    archived = db.archive_job_partitions(max_age_days)
+    logger.info(f"Job partition maintenance archived {len(archived)} partitions")
+    return archived
+
+def setup_archival_worker():
+    """
+    Set up the upload archival worker to run periodically
+    """
+    def worker():
+        logger.info("Starting upload archival worker")
+        while True:
+            try:
+                run_upload_compaction()
+                run_job_partition_maintenance()
+            except Exception as e:
+                logger.error(f"Critical error in upload archival worker: {str(e)}")
+            finally:
+                time.sleep(24 * 3600)  # Run once a day
+    
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    logger.info("Upload archival worker initialized")
+
+if __name__ == "__main__":
+    run_upload_compaction()
+    run_job_partition_maintenance()
@@ -0,0 +1,97 @@
+import os
+import logging
+from typing import List, Dict, Optional
+import asyncpg
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AsyncDatabase:
+    """asyncio data access for background workers, backed by its own asyncpg pool.
+
+    Use as an async context manager so the pool is opened and closed with
+    the worker's event loop:
+
+        async with AsyncDatabase() as db:
+            users = await db.get_notification_recipients()
+    """
+
+    def __init__(self, min_size: int = 1, max_size: Optional[int] = None):
+        self.min_size = min_size
+        self.max_size = max_size or int(os.environ.get('ASYNC_DB_POOL_MAX_CONNECTIONS', 20))
+        self.query_timeout = 30  # 30 seconds timeout
+        self._pool = None
+
+    async def connect(self):
+        """Open the connection pool"""
+        if self._pool is None:
+            try:
+                self._pool = await asyncpg.create_pool(
+                    host=os.environ['PGHOST'],
+                    database=os.environ['PGDATABASE'],
+                    user=os.environ['PGUSER'],
+                    password=os.environ['PGPASSWORD'],
+                    port=os.environ['PGPORT'],
+                    min_size=self.min_size,
+                    max_size=self.max_size,
+                    command_timeout=self.query_timeout,
+                    server_settings={'statement_timeout': str(self.query_timeout * 1000)}
+                )
+            except Exception as e:
+                logger.error(f"Error initializing async database pool: {str(e)}")
+                raise
+        return self
+
+    async def close(self):
+        """Close the connection pool"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def fetch(self, query: str, *args) -> List[Dict]:
+        """Run a query and return all rows as dicts"""
+        rows = await self._pool.fetch(query, *args)
+        return [dict(row) for row in rows]
+
+    async def execute(self, query: str, *args) -> str:
+        """Run a statement and return its status tag"""
+        return await self._pool.execute(query, *args)
+
+    async def get_notification_recipients(self) -> List[Dict]:
+        """Get users with email notifications enabled"""
+        return await self.fetch("""
+            SELECT DISTINCT u.id, u.email, ep.min_match_score
+            FROM users u
+            JOIN email_preferences ep ON u.id = ep.user_id
+            WHERE ep.is_enabled = true
+        """)
+
+    async def get_unnotified_matches(self, user_id: int, min_score: float,
+                                     limit: int = 20) -> List[Dict]:
+        """Get a user's best job matches that have not been emailed yet"""
+        return await self.fetch("""
+            SELECT j.id, j.title, j.company, j.location, j.description, j.url,
+                   jm.match_score
+            FROM job_matches jm
+            JOIN jobs j ON j.id = jm.job_id
+            WHERE jm.user_id = $1
+            AND jm.is_notified = false
+            AND jm.match_score >= $2
+            ORDER BY jm.match_score DESC
+            LIMIT $3
+        """, user_id, min_score, limit)
+
+    async def mark_matches_as_notified(self, user_id: int, job_ids: List[int]) -> None:
+        """Mark a user's matches as emailed"""
+        await self.execute("""
+            UPDATE job_matches
+            SET is_notified = true
+            WHERE user_id = $1 AND job_id = ANY($2::int[])
+        """, user_id, job_ids)
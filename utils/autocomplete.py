@@ -0,0 +1,108 @@
+import bisect
+import heapq
+import threading
+import time
+import logging
+from typing import Callable, Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+class PrefixIndex:
+    """Case-insensitive prefix lookup over weighted terms.
+
+    Terms are kept in one sorted list, so a prefix maps to a contiguous
+    slice found with bisect. The best matches for very short prefixes,
+    whose slices are large, are precomputed when the index is built.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, int]], top_k: int = 10, hot_prefix_len: int = 2):
+        merged: Dict[str, List] = {}
+        for term, weight in terms:
+            if not term or not term.strip():
+                continue
+            term = term.strip()
+            key = term.lower()
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = [term, weight, weight]
+            else:
+                # Keep the most common spelling, count every occurrence
+                entry[1] += weight
+                if weight > entry[2]:
+                    entry[0], entry[2] = term, weight
+
+        self._keys = sorted(merged)
+        self._terms = [merged[key][0] for key in self._keys]
+        self._weights = [merged[key][1] for key in self._keys]
+        self.top_k = top_k
+        self.hot_prefix_len = hot_prefix_len
+
+        hot: Dict[str, list] = {}
+        for i, key in enumerate(self._keys):
+            for length in range(1, min(hot_prefix_len, len(key)) + 1):
+                heap = hot.setdefault(key[:length], [])
+                item = (self._weights[i], -i)
+                if len(heap) < top_k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+        self._hot = {
+            prefix: [-i for _, i in sorted(heap, reverse=True)]
+            for prefix, heap in hot.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, prefix: str, limit: int = 10) -> List[str]:
+        """Most frequent terms starting with prefix, best first"""
+        key = (prefix or '').strip().lower()
+        if not key:
+            return []
+        if len(key) <= self.hot_prefix_len and limit <= self.top_k:
+            return [self._terms[i] for i in self._hot.get(key, [])[:limit]]
+
+        lo = bisect.bisect_left(self._keys, key)
+        hi = bisect.bisect_left(self._keys, key + '\uffff', lo)
+        best = heapq.nlargest(limit, range(lo, hi), key=self._weights.__getitem__)
+        return [self._terms[i] for i in best]
+
+class Autocomplete:
+    """Prefix suggestions served from memory and rebuilt in the background"""
+
+    def __init__(self, loader: Callable[[], Iterable[Tuple[str, int]]],
+                 refresh_interval: float = 600):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self._index = PrefixIndex([])
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """Rebuild the index from the loader and swap it in"""
+        started = time.monotonic()
+        index = PrefixIndex(self.loader())
+        # Readers keep using the old index until this single assignment
+        self._index = index
+        logger.info(f"Autocomplete index rebuilt with {len(index)} terms "
+                    f"in {time.monotonic() - started:.2f}s")
+        return len(index)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            def worker():
+                while True:
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        logger.error(f"Error refreshing autocomplete index: {str(e)}")
+                    time.sleep(self.refresh_interval)
+
+            self._thread = threading.Thread(target=worker, name='autocomplete-refresh', daemon=True)
+            self._thread.start()
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[str]:
+        return self._index.lookup(prefix, limit)
@@ -0,0 +1,189 @@
+import threading
+import time
+import logging
+from typing import Dict, List
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+logger = logging.getLogger(__name__)
+
+class PoolTimeout(PoolError):
+    """Raised when no connection becomes available within the checkout timeout"""
+
+class PooledConnection(extensions.connection):
+    """psycopg2 connection that remembers which named statements it has prepared"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool with a bounded wait queue.
+
+    Callers block for up to ``checkout_timeout`` seconds when every
+    connection is in use; at most ``max_waiters`` callers may wait at once.
+    Session settings belong in ``connect_kwargs`` (e.g. ``options``) so they
+    are applied once when a connection is opened.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, checkout_timeout: float = 10.0,
+                 max_waiters: int = 50, **connect_kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.checkout_timeout = checkout_timeout
+        self.max_waiters = max_waiters
+        self._connect_kwargs = connect_kwargs
+        self._idle: List = []
+        self._in_use = set()
+        self._opening = 0
+        self._waiting = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'total_wait_time': 0.0,
+            'max_wait_time': 0.0,
+            'timeouts': 0,
+            'rejected': 0,
+            'discarded': 0
+        }
+
+        for _ in range(minconn):
+            self._idle.append(self._connect())
+
+    def _connect(self):
+        """Open a new connection with the pool's session settings"""
+        return psycopg2.connect(connection_factory=PooledConnection, **self._connect_kwargs)
+
+    def _is_healthy(self, conn) -> bool:
+        """Cheap liveness check from libpq state, without a round trip"""
+        return (conn.closed == 0 and
+                conn.get_transaction_status() == extensions.TRANSACTION_STATUS_IDLE)
+
+    def _discard(self, conn) -> None:
+        self._stats['discarded'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _size(self) -> int:
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def getconn(self, timeout: float = None):
+        """Borrow a connection, waiting up to the checkout timeout if none is free"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+
+                while self._idle:
+                    conn = self._idle.pop()
+                    if self._is_healthy(conn):
+                        self._in_use.add(conn)
+                        self._record_checkout(started, waited)
+                        return conn
+                    self._discard(conn)
+
+                if self._size() < self.maxconn:
+                    # Reserve the slot, then connect outside the lock
+                    self._opening += 1
+                    break
+
+                if not waited:
+                    if self._waiting >= self.max_waiters:
+                        self._stats['rejected'] += 1
+                        raise PoolTimeout("connection pool wait queue is full")
+                    waited = True
+
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    self._record_wait(started)
+                    raise PoolTimeout(f"no connection available within {timeout}s")
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._opening -= 1
+            self._in_use.add(conn)
+            self._record_checkout(started, waited)
+        return conn
+
+    def _record_wait(self, started: float) -> None:
+        wait_time = time.monotonic() - started
+        self._stats['waits'] += 1
+        self._stats['total_wait_time'] += wait_time
+        self._stats['max_wait_time'] = max(self._stats['max_wait_time'], wait_time)
+
+    def _record_checkout(self, started: float, waited: bool) -> None:
+        self._stats['checkouts'] += 1
+        if waited:
+            self._record_wait(started)
+
+    def putconn(self, conn, close: bool = False) -> None:
+        """Return a borrowed connection, rolling back any open transaction"""
+        if not close and conn.closed == 0:
+            status = conn.get_transaction_status()
+            if status in (extensions.TRANSACTION_STATUS_INTRANS,
+                          extensions.TRANSACTION_STATUS_INERROR):
+                try:
+                    conn.rollback()
+                except Exception:
+                    close = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                close = True
+
+        with self._cond:
+            if conn not in self._in_use:
+                raise PoolError("trying to put unkeyed connection")
+            self._in_use.discard(conn)
+            if close or conn.closed != 0 or self._closed:
+                self._discard(conn)
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def closeall(self) -> None:
+        """Close every connection and reject further checkouts"""
+        with self._cond:
+            self._closed = True
+            for conn in self._idle + list(self._in_use):
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._idle = []
+            self._in_use = set()
+            self._cond.notify_all()
+
+    def metrics(self) -> Dict:
+        """Snapshot of pool usage and wait statistics"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'max_size': self.maxconn,
+                'size': self._size(),
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'waiting': self._waiting
+            })
+        stats['avg_wait_time'] = (stats['total_wait_time'] / stats['waits']
+                                  if stats['waits'] else 0.0)
+        return stats
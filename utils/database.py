@@ -1,58 +1,227 @@
 import os
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor, execute_values
 from contextlib import contextmanager
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 import threading
 import time
 import logging
+import base64
+import itertools
+import json
+import re
+from utils.connection_pool import ConnectionPool, PoolTimeout
+from utils.query_stats import QueryStats, instrumented_cursor_class, is_read_query
+from utils.query_cache import QueryCache, CacheInvalidationListener
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Materialized views behind the analytics dashboard, see schema_updates_analytics.sql
+ANALYTICS_VIEWS = (
+    'analytics_job_daily_counts',
+    'analytics_location_counts'
+)
+
+def encode_cursor(*values) -> str:
+    """Encode a keyset position as an opaque, URL-safe page token"""
+    payload = json.dumps(values, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(token: str) -> list:
+    """Decode a page token produced by encode_cursor"""
+    return json.loads(base64.urlsafe_b64decode(token.encode()))
+
+def to_positional_params(query: str) -> str:
+    """Rewrite psycopg2 %s placeholders as $1..$n (and %% as %) for PREPARE"""
+    counter = itertools.count(1)
+    return re.sub(r'%%|%s', lambda m: '%' if m.group() == '%%' else f"${next(counter)}", query)
+
 class Database:
     _instance = None
     _lock = threading.Lock()
     _pool = None
+    # Named statements prepared lazily on each pooled connection; see execute_prepared
+    _statements: Dict[str, str] = {}
+    _statements_lock = threading.Lock()
     
-    def __new__(cls):
+    def __new__(cls, replica_dsns: Optional[List[str]] = None):
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super(Database, cls).__new__(cls)
-                    cls._instance._initialize()
+                    cls._instance._initialize(replica_dsns)
         return cls._instance
     
-    def _initialize(self):
+    def _initialize(self, replica_dsns: Optional[List[str]] = None):
         """Initialize connection pool and settings"""
         try:
+            self.query_timeout = 30  # 30 seconds timeout
+            # Session settings are applied once per connection at connect time
+            session_options = f"-c statement_timeout={self.query_timeout * 1000}"
+            pool_settings = {
+                'maxconn': int(os.environ.get('DB_POOL_MAX_CONNECTIONS', 10)),
+                'checkout_timeout': float(os.environ.get('DB_POOL_CHECKOUT_TIMEOUT', 10)),
+                'max_waiters': int(os.environ.get('DB_POOL_MAX_WAITERS', 50)),
+                'options': session_options
+            }
+            self._connect_kwargs = {
+                'host': os.environ['PGHOST'],
+                'database': os.environ['PGDATABASE'],
+                'user': os.environ['PGUSER'],
+                'password': os.environ['PGPASSWORD'],
+                'port': os.environ['PGPORT']
+            }
             if self._pool is None:
-                self._pool = SimpleConnectionPool(
+                self._pool = ConnectionPool(
                     minconn=1,
-                    maxconn=10,
-                    host=os.environ['PGHOST'],
-                    database=os.environ['PGDATABASE'],
-                    user=os.environ['PGUSER'],
-                    password=os.environ['PGPASSWORD'],
-                    port=os.environ['PGPORT']
+                    **self._connect_kwargs,
+                    **pool_settings
                 )
+
+            # Optional streaming replicas for read-only traffic
+            if replica_dsns is None:
+                replica_dsns = [dsn.strip() for dsn in os.environ.get('PGREPLICA_DSNS', '').split(',')
+                                if dsn.strip()]
+            self.max_replica_lag = float(os.environ.get('PGREPLICA_MAX_LAG', 5))
+            self.replica_check_interval = float(os.environ.get('PGREPLICA_CHECK_INTERVAL', 5))
+            self._replicas = [
+                {
+                    # Replicas connect lazily so one being down never blocks startup
+                    'pool': ConnectionPool(minconn=0, dsn=dsn, **pool_settings),
+                    'lag': None,
+                    'checked_at': 0.0,
+                    'lock': threading.Lock()
+                }
+                for dsn in replica_dsns
+            ]
+            self._replica_counter = itertools.count()
+            self._stream_counter = itertools.count()
             self._local = threading.local()
-            self._local.connection = None
-            self.query_timeout = 30  # 30 seconds timeout
+            # Last write per bound session (see bind_session), for read-your-writes
+            self._session_writes: Dict = {}
+            self._session_lock = threading.Lock()
+            # Per-statement latency histograms and slow-query log; DB_QUERY_STATS=0 disables
+            self.query_stats = (QueryStats.from_env()
+                                if os.environ.get('DB_QUERY_STATS', '1') != '0' else None)
+            if self.query_stats is not None:
+                self.query_stats.resolve_statement = self._statements.get
+
+            # Read-through result cache, evicted by LISTEN/NOTIFY; QUERY_CACHE=0 disables
+            self.query_cache = None
+            if os.environ.get('QUERY_CACHE', '1') != '0':
+                self.query_cache = QueryCache(
+                    max_entries=int(os.environ.get('QUERY_CACHE_MAX_ENTRIES', 1000)),
+                    ttl=float(os.environ.get('QUERY_CACHE_TTL', 3600)),
+                    settle_time=self.max_replica_lag if self._replicas else 0.0
+                )
+                self._cache_listener = CacheInvalidationListener(
+                    self.query_cache,
+                    lambda: psycopg2.connect(**self._connect_kwargs)
+                )
+                self._cache_listener.start()
         except Exception as e:
             logger.error(f"Error initializing database pool: {str(e)}")
             raise
 
-    @contextmanager
-    def get_connection_with_retry(self, max_retries=3):
-        """Get a database connection with retry mechanism"""
+    def _measure_replica_lag(self, replica: Dict) -> None:
+        """Refresh a replica's replay lag; unreachable replicas get infinite lag"""
+        with replica['lock']:
+            if time.monotonic() - replica['checked_at'] < self.replica_check_interval:
+                return
+            lag = float('inf')
+            conn = None
+            try:
+                conn = replica['pool'].getconn(timeout=1)
+                with conn.cursor() as cur:
+                    # A replica that has replayed everything it received is current
+                    cur.execute("""
+                        SELECT CASE
+                            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                        END
+                    """)
+                    lag = float(cur.fetchone()[0])
+                conn.rollback()
+            except Exception as e:
+                logger.warning(f"Replica health check failed: {str(e)}")
+            finally:
+                if conn is not None:
+                    replica['pool'].putconn(conn)
+            replica['lag'] = lag
+            replica['checked_at'] = time.monotonic()
+
+    def _route(self, readonly: bool) -> ConnectionPool:
+        """Pick the pool for a cursor: a current replica for reads, else the primary"""
+        if not readonly or not self._replicas:
+            return self._pool
+
+        connections = self._thread_connections()
+        if id(self._pool) in connections:
+            # Already inside a primary transaction on this thread
+            return self._pool
+
+        last_write = getattr(self._local, 'last_write', None)
+        session = getattr(self._local, 'session', None)
+        if session is not None:
+            with self._session_lock:
+                session_write = self._session_writes.get(session)
+            if session_write is not None and (last_write is None or session_write > last_write):
+                last_write = session_write
+        if last_write is not None and time.monotonic() - last_write < self.max_replica_lag:
+            # Read-your-writes: replicas may not have this session's changes yet
+            return self._pool
+
+        # Round-robin, skipping replicas that are behind or unreachable
+        start = next(self._replica_counter)
+        for offset in range(len(self._replicas)):
+            replica = self._replicas[(start + offset) % len(self._replicas)]
+            self._measure_replica_lag(replica)
+            if replica['lag'] is not None and replica['lag'] <= self.max_replica_lag:
+                return replica['pool']
+        return self._pool
+
+    def _mark_replica_down(self, pool: ConnectionPool) -> None:
+        for replica in self._replicas:
+            if replica['pool'] is pool:
+                replica['lag'] = float('inf')
+                replica['checked_at'] = time.monotonic()
+
+    def bind_session(self, session) -> None:
+        """Attribute this thread's queries to a user session.
+
+        Streamlit runs every rerun on a new thread, so the app binds the
+        session at the start of each run; writes made in one rerun then keep
+        the session's reads on the primary in the next.
+        """
+        self._local.session = session
+
+    def mark_write(self) -> None:
+        """Keep this thread's and session's reads on the primary until replicas catch up"""
+        now = time.monotonic()
+        self._local.last_write = now
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            return
+        with self._session_lock:
+            self._session_writes[session] = now
+            if len(self._session_writes) > 1000:
+                # Forget sessions whose writes every replica has caught up with
+                self._session_writes = {
+                    key: at for key, at in self._session_writes.items()
+                    if now - at < self.max_replica_lag
+                }
+
+    def _get_connection_retrying(self, max_retries=3, pool: Optional[ConnectionPool] = None):
+        """Check out a connection, retrying failures other than a pool timeout"""
         for attempt in range(max_retries):
             try:
-                conn = self.get_connection()
-                yield conn
-                return
+                return self.get_connection(pool)
+            except PoolTimeout:
+                # The pool already waited its full checkout timeout
+                raise
             except Exception as e:
                 if attempt == max_retries - 1:
                     logger.error(f"Failed to get connection after {max_retries} attempts")
@@ -60,57 +229,139 @@ class Database:
                 logger.warning(f"Connection attempt {attempt + 1} failed, retrying...")
                 time.sleep(1 * (attempt + 1))
 
+    @contextmanager
+    def get_connection_with_retry(self, max_retries=3, pool: Optional[ConnectionPool] = None):
+        """Get a database connection with retry mechanism"""
+        yield self._get_connection_retrying(max_retries, pool)
+
     def test_connection(self) -> bool:
         """Test database connection"""
         try:
-            with self.get_connection_with_retry() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT 1")
-                    return True
+            with self.get_cursor() as cur:
+                cur.execute("SELECT 1")
+                return True
         except Exception as e:
             logger.error(f"Connection test failed: {str(e)}")
             return False
 
-    def get_connection(self):
-        """Get a connection from the pool with thread-local storage"""
-        if not hasattr(self._local, 'connection') or self._local.connection is None:
-            if self._pool is None:
-                self._initialize()
-            self._local.connection = self._pool.getconn()
-        return self._local.connection
+    def _thread_connections(self) -> Dict[int, list]:
+        """This thread's checked-out connections: id(pool) -> [conn, depth, pool]"""
+        if not hasattr(self._local, 'connections'):
+            self._local.connections = {}
+        return self._local.connections
+
+    def get_connection(self, pool: Optional[ConnectionPool] = None):
+        """Get a connection from the pool with thread-local storage.
+
+        Nested calls on the same thread share one connection per pool; it
+        goes back to the pool when the outermost caller returns it.
+        """
+        if self._pool is None:
+            self._initialize()
+        pool = pool or self._pool
+        connections = self._thread_connections()
+        entry = connections.get(id(pool))
+        if entry is None:
+            entry = connections[id(pool)] = [pool.getconn(), 0, pool]
+        entry[1] += 1
+        return entry[0]
 
     def return_connection(self, conn):
         """Return a connection to the pool with safety checks"""
         try:
-            if hasattr(self._local, 'connection') and self._local.connection is conn:
-                if self._pool is not None:
-                    self._pool.putconn(conn)
-                self._local.connection = None
+            connections = self._thread_connections()
+            for key, entry in list(connections.items()):
+                if entry[0] is conn:
+                    entry[1] -= 1
+                    if entry[1] > 0:
+                        return
+                    del connections[key]
+                    entry[2].putconn(conn)
+                    return
         except Exception as e:
             logger.error(f"Error returning connection to pool: {str(e)}")
 
+    def pool_metrics(self) -> Dict:
+        """Report pool size, in-use and idle connections, wait times and timeouts"""
+        if self._pool is None:
+            return {}
+        metrics = self._pool.metrics()
+        metrics['replicas'] = [
+            dict(replica['pool'].metrics(), lag=replica['lag'])
+            for replica in self._replicas
+        ]
+        return metrics
+
+    def query_metrics(self, limit: Optional[int] = None) -> Dict:
+        """Report per-statement latency histograms and recent slow queries"""
+        if self.query_stats is None:
+            return {}
+        return self.query_stats.summary(limit)
+
+    def export_query_metrics(self, path: Optional[str] = None, limit: Optional[int] = None) -> str:
+        """Export query metrics as JSON, optionally writing them to a file"""
+        if self.query_stats is None:
+            return json.dumps({})
+        return self.query_stats.export_json(path, limit)
+
+    def cached(self, key, tags, loader):
+        """Serve loader's result from the query cache, keyed by key and tagged by table"""
+        if self.query_cache is None:
+            return loader()
+        return self.query_cache.get_or_load(key, tags, loader)
+
+    def invalidate_cache(self, tag: str) -> None:
+        """Evict cached results for a table or a "table:user_id" tag right away"""
+        if self.query_cache is not None:
+            self.query_cache.invalidate(tag)
+
+    def cache_metrics(self) -> Dict:
+        """Report query cache hits, misses, evictions and size"""
+        if self.query_cache is None:
+            return {}
+        return self.query_cache.metrics()
+
     @property
     def conn(self):
         """Provide backward compatibility for conn attribute"""
         return self.get_connection()
 
     @contextmanager
-    def get_cursor(self, cursor_factory=None):
-        """Get a database cursor with automatic cleanup and error handling"""
+    def get_cursor(self, cursor_factory=None, readonly: bool = False):
+        """Get a database cursor with automatic cleanup and error handling.
+
+        readonly cursors may be served by a replica; everything else runs on
+        the primary and keeps this thread's reads there for a short while.
+        """
         connection = None
         try:
-            with self.get_connection_with_retry() as connection:
-                cursor = connection.cursor(cursor_factory=cursor_factory)
-                try:
-                    # Set query timeout
-                    cursor.execute(f"SET statement_timeout = {self.query_timeout * 1000}")
-                    yield cursor
-                    connection.commit()
-                except Exception as e:
-                    connection.rollback()
+            pool = self._route(readonly)
+            checkout_started = time.monotonic()
+            try:
+                if pool is self._pool:
+                    connection = self._get_connection_retrying()
+                else:
+                    connection = self.get_connection(pool)
+            except Exception as e:
+                if pool is self._pool:
                     raise
-                finally:
-                    cursor.close()
+                # Fall back to the primary when a replica is unreachable
+                logger.warning(f"Replica unavailable, using primary: {str(e)}")
+                self._mark_replica_down(pool)
+                connection = self._get_connection_retrying()
+
+            cursor = self._make_cursor(connection, cursor_factory,
+                                       pool_wait=time.monotonic() - checkout_started)
+            try:
+                yield cursor
+                connection.commit()
+                if not readonly:
+                    self.mark_write()
+            except Exception as e:
+                connection.rollback()
+                raise
+            finally:
+                cursor.close()
         except Exception as e:
             logger.error(f"Error in database operation: {str(e)}")
             raise
@@ -118,40 +369,732 @@ class Database:
             if connection is not None:
                 self.return_connection(connection)
 
+    def _make_cursor(self, connection, cursor_factory=None, name: Optional[str] = None,
+                     pool_wait: float = 0.0):
+        """Open a cursor, instrumented when query stats are enabled"""
+        if self.query_stats is None:
+            return connection.cursor(name, cursor_factory=cursor_factory)
+        cursor = connection.cursor(name, cursor_factory=instrumented_cursor_class(
+            cursor_factory or extensions.cursor
+        ))
+        cursor.query_stats = self.query_stats
+        cursor.pending_pool_wait = pool_wait
+        return cursor
+
+    def stream(self, query: str, params: tuple = None, batch_size: int = 1000,
+               cursor_factory=None, readonly: bool = True) -> Iterator[List]:
+        """Yield the rows of a large query in batches of batch_size.
+
+        Rows are read through a named server-side cursor on a connection
+        reserved for the stream, so client memory stays bounded by one
+        batch and the caller's own transactions are unaffected. The
+        connection is released when the generator is exhausted or closed.
+        """
+        pool = self._route(readonly)
+        checkout_started = time.monotonic()
+        try:
+            connection = pool.getconn()
+        except Exception as e:
+            if pool is self._pool:
+                raise
+            logger.warning(f"Replica unavailable, using primary: {str(e)}")
+            self._mark_replica_down(pool)
+            pool = self._pool
+            connection = pool.getconn()
+
+        try:
+            name = f"stream_{next(self._stream_counter)}"
+            cursor = self._make_cursor(connection, cursor_factory, name=name,
+                                       pool_wait=time.monotonic() - checkout_started)
+            try:
+                cursor.itersize = batch_size
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+            connection.commit()
+        finally:
+            # The pool rolls back whatever an abandoned stream left open
+            pool.putconn(connection)
+
     def execute_query(self, query: str, params: tuple = None, fetch: bool = True) -> Optional[List]:
-        """Execute a query with error handling and timeout"""
+        """Execute a query with error handling and timeout.
+
+        Plain SELECTs may run on a replica; anything that writes, including
+        INSERT ... RETURNING, runs on the primary.
+        """
         try:
-            with self.get_cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(f"SET statement_timeout = {self.query_timeout * 1000}")
+            readonly = fetch and is_read_query(query)
+            with self.get_cursor(cursor_factory=RealDictCursor, readonly=readonly) as cur:
                 cur.execute(query, params)
                 if fetch:
                     return cur.fetchall()
-                return None
+            return None
         except Exception as e:
             logger.error(f"Error executing query: {str(e)}")
             return None
 
+    @classmethod
+    def register_statement(cls, name: str, query: str) -> None:
+        """Register a named statement written with %s placeholders"""
+        with cls._statements_lock:
+            cls._statements[name] = to_positional_params(query)
+
+    @classmethod
+    def registered_statements(cls) -> Dict[str, str]:
+        """All named statements the application runs, by name"""
+        with cls._statements_lock:
+            return dict(cls._statements)
+
+    def execute_prepared(self, name: str, params: tuple = (), fetch: Optional[str] = 'all',
+                         cursor_factory=None, readonly: bool = False):
+        """Execute a registered statement by name.
+
+        The statement is prepared with PREPARE the first time a pooled
+        connection runs it and with EXECUTE after that, so it is planned
+        once per connection. fetch is 'all', 'one' or None; with None the
+        affected row count is returned. readonly statements may run on a
+        replica.
+        """
+        query = self._statements[name]
+        with self.get_cursor(cursor_factory=cursor_factory, readonly=readonly) as cur:
+            prepared = cur.connection.prepared_statements
+            if name not in prepared:
+                cur.execute(f"PREPARE {name} AS {query}")
+                prepared.add(name)
+            if params:
+                cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", tuple(params))
+            else:
+                cur.execute(f"EXECUTE {name}")
+            if fetch == 'all':
+                return cur.fetchall()
+            if fetch == 'one':
+                return cur.fetchone()
+            return cur.rowcount
+
+    def _build_job_search_filter(self, query: Optional[str], location: Optional[str],
+                                 fuzzy: bool = False):
+        """Build the FROM/WHERE clause shared by job search and its count"""
+        from_clause = "jobs"
+        conditions = []
+        params = []
+        if fuzzy and query and query.strip():
+            # Trigram match on title/company; the term is bound once as f.term
+            from_clause = "jobs, (SELECT %s::text AS term) AS f"
+            params.append(query.strip())
+            conditions.append("(title %% f.term OR company %% f.term)")
+        elif query and query.strip():
+            # Parsed once and referenced as q by the match and the ranking
+            from_clause = "jobs, websearch_to_tsquery('english', %s) AS q"
+            params.append(query.strip())
+            conditions.append("search_vector @@ q")
+        if location and location.strip():
+            conditions.append("location ILIKE %s")
+            params.append(f"%{location.strip()}%")
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return from_clause, where_clause, params
+
+    def get_jobs(self, query: Optional[str] = None, location: Optional[str] = None,
+                 limit: int = 10, cursor: Optional[str] = None,
+                 count_cap: Optional[int] = 10000, fuzzy: bool = False) -> Dict:
+        """Search jobs by keywords using the weighted full-text index.
+
+        With fuzzy, the query is matched against title and company by
+        trigram similarity instead, which tolerates typos. Pages are keyed
+        on (rank or similarity, id) for keyword searches and on
+        (posted_at, id) otherwise, so every page costs the same regardless of
+        depth. When count_cap is set, the same statement also counts matches
+        up to the cap instead of running a separate full COUNT(*).
+
+        Returns a dict with 'jobs', 'next_cursor', 'total' and
+        'total_is_exact'; 'total' is None when count_cap is None.
+        """
+        result = {'jobs': [], 'next_cursor': None, 'total': None, 'total_is_exact': False}
+        try:
+            from_clause, where_clause, filter_params = self._build_job_search_filter(
+                query, location, fuzzy
+            )
+            if fuzzy and query and query.strip():
+                sort_key = "GREATEST(similarity(title, f.term), similarity(company, f.term))"
+                sort_type = "real"
+            elif query and query.strip():
+                sort_key = "ts_rank_cd(search_vector, q)"
+                sort_type = "real"
+            else:
+                sort_key = "posted_at"
+                sort_type = "timestamp"
+
+            page_params = list(filter_params)
+            seek_clause = ""
+            if cursor:
+                last_sort, last_id = decode_cursor(cursor)
+                seek_clause = f"WHERE (m.sort_key, m.id) < (%s::{sort_type}, %s)"
+                page_params += [last_sort, last_id]
+            page_params.append(limit + 1)
+
+            page_query = f"""
+                SELECT * FROM (
+                    SELECT id, title, company, location, description, url, posted_at,
+                           {sort_key} AS sort_key
+                    FROM {from_clause}
+                    {where_clause}
+                ) m
+                {seek_clause}
+                ORDER BY m.sort_key DESC, m.id DESC
+                LIMIT %s
+            """
+
+            # One prepared statement per combination of filters
+            variant = ''.join([
+                ('f' if fuzzy else 'q') if query and query.strip() else '_',
+                'l' if location and location.strip() else '_',
+                'c' if cursor else '_',
+                't' if count_cap is not None else '_'
+            ])
+            statement = f"search_jobs_{variant}"
+
+            if count_cap is None:
+                sql = page_query
+                params = page_params
+            else:
+                # Counting stops one past the cap, so broad queries stay cheap
+                sql = f"""
+                    SELECT t.total AS total_matches, p.*
+                    FROM (
+                        SELECT COUNT(*) AS total FROM (
+                            SELECT 1 FROM {from_clause} {where_clause} LIMIT %s
+                        ) capped
+                    ) t
+                    LEFT JOIN LATERAL ({page_query}) p ON true
+                """
+                params = filter_params + [count_cap + 1] + page_params
+            if statement not in self._statements:
+                self.register_statement(statement, sql)
+
+            rows = self.cached(
+                (statement, tuple(params)), ('jobs',),
+                lambda: [dict(row) for row in self.execute_prepared(
+                    statement, params, cursor_factory=RealDictCursor, readonly=True
+                )]
+            )
+            if count_cap is not None:
+                total = rows[0]['total_matches'] if rows else 0
+                result['total'] = min(total, count_cap)
+                result['total_is_exact'] = total <= count_cap
+                # An empty page still returns the count row
+                rows = [row for row in rows if row['id'] is not None]
+                for row in rows:
+                    del row['total_matches']
+
+            # The extra row only tells us whether another page exists
+            if len(rows) > limit:
+                rows = rows[:limit]
+                result['next_cursor'] = encode_cursor(rows[-1]['sort_key'], rows[-1]['id'])
+            result['jobs'] = rows
+            return result
+        except Exception as e:
+            logger.error(f"Error searching jobs: {str(e)}")
+            return result
+
+    def get_total_jobs(self, query: Optional[str] = None, location: Optional[str] = None,
+                       fuzzy: bool = False) -> int:
+        """Count every job matching a keyword search exactly"""
+        from_clause, where_clause, params = self._build_job_search_filter(query, location, fuzzy)
+
+        def load():
+            with self.get_cursor(readonly=True) as cur:
+                cur.execute(f"""
+                    SELECT COUNT(*) FROM {from_clause} {where_clause}
+                """, tuple(params) if params else None)
+                return cur.fetchone()[0]
+
+        try:
+            return self.cached(('count_jobs', from_clause, where_clause, tuple(params)), ('jobs',), load)
+        except Exception as e:
+            logger.error(f"Error counting jobs: {str(e)}")
+            return 0
+
+    def get_autocomplete_terms(self, limit: int = 50000) -> List[Tuple[str, int]]:
+        """Get the most common job titles and companies with their job counts"""
+        try:
+            with self.get_cursor(readonly=True) as cur:
+                cur.execute("""
+                    (SELECT title, COUNT(*) FROM jobs GROUP BY title ORDER BY 2 DESC LIMIT %s)
+                    UNION ALL
+                    (SELECT company, COUNT(*) FROM jobs GROUP BY company ORDER BY 2 DESC LIMIT %s)
+                """, (limit, limit))
+                return cur.fetchall()
+        except Exception as e:
+            logger.error(f"Error getting autocomplete terms: {str(e)}")
+            return []
+
+    def get_bookmarks(self, user_id: int, limit: int = 5,
+                      cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Get one page of a user's bookmarked jobs, newest first.
+
+        Rows carry an excerpt rather than the full description (see
+        get_job_description) plus the user's match score when one exists.
+        """
+        try:
+            if cursor:
+                last_created, last_id = decode_cursor(cursor)
+                statement = 'get_bookmarks_after'
+                params = (user_id, last_created, last_id, limit + 1)
+            else:
+                statement = 'get_bookmarks_first'
+                params = (user_id, limit + 1)
+            rows = self.cached(
+                (statement, params), (f'bookmarks:{user_id}', f'job_matches:{user_id}', 'jobs'),
+                lambda: [dict(row) for row in self.execute_prepared(
+                    statement, params, cursor_factory=RealDictCursor, readonly=True
+                )]
+            )
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1]['bookmarked_at'], rows[-1]['bookmark_id'])
+            return rows, next_cursor
+        except Exception as e:
+            logger.error(f"Error getting bookmarks: {str(e)}")
+            return [], None
+
+    def save_bookmark(self, user_id: int, job_id: int) -> bool:
+        """Bookmark a job for a user; returns False if it was already saved or no longer listed"""
+        try:
+            created = self.execute_prepared('save_bookmark', (user_id, job_id), fetch=None) == 1
+            self.invalidate_cache(f'bookmarks:{user_id}')
+            return created
+        except Exception as e:
+            logger.error(f"Error saving bookmark: {str(e)}")
+            return False
+
+    def delete_bookmark(self, user_id: int, job_id: int) -> bool:
+        """Remove a job from a user's bookmarks"""
+        try:
+            deleted = self.execute_prepared('delete_bookmark', (user_id, job_id), fetch=None) == 1
+            self.invalidate_cache(f'bookmarks:{user_id}')
+            return deleted
+        except Exception as e:
+            logger.error(f"Error deleting bookmark: {str(e)}")
+            return False
+
+    def get_user_activity(self, user_id: int) -> Dict:
+        """Get a user's match count, bookmark count and average match score"""
+        try:
+            row = self.execute_prepared(
+                'get_user_activity', (user_id, user_id),
+                fetch='one', cursor_factory=RealDictCursor, readonly=True
+            )
+            return {
+                'total_matches': row['total_matches'],
+                'bookmarked': row['bookmarked'],
+                'avg_match': round(row['avg_match'], 2)
+            }
+        except Exception as e:
+            logger.error(f"Error getting user activity: {str(e)}")
+            return {'total_matches': 0, 'bookmarked': 0, 'avg_match': 0}
+
+    def get_job_description(self, job_id: int) -> Optional[str]:
+        """Get a job's full description, for views that only list excerpts"""
+        def load():
+            row = self.execute_prepared('get_job_description', (job_id,), fetch='one', readonly=True)
+            return row[0] if row else None
+
+        try:
+            return self.cached(('get_job_description', job_id), ('jobs',), load)
+        except Exception as e:
+            logger.error(f"Error getting job description: {str(e)}")
+            return None
+
+    def get_email_preferences(self, user_id: int) -> Dict:
+        """Get a user's notification preferences, with defaults if none are saved"""
+        def load():
+            row = self.execute_prepared(
+                'get_email_preferences', (user_id,),
+                fetch='one', cursor_factory=RealDictCursor, readonly=True
+            )
+            return dict(row) if row else None
+
+        try:
+            row = self.cached(
+                ('get_email_preferences', user_id), (f'email_preferences:{user_id}',), load
+            )
+            if row:
+                return row
+        except Exception as e:
+            logger.error(f"Error getting email preferences: {str(e)}")
+        return {'is_enabled': True, 'min_match_score': 70}
+
+    def update_email_preferences(self, user_id: int, is_enabled: bool,
+                                 min_match_score: int) -> bool:
+        """Create or update a user's notification preferences"""
+        try:
+            self.execute_prepared(
+                'upsert_email_preferences', (user_id, is_enabled, min_match_score), fetch=None
+            )
+            # Don't wait for the change notification to reach this process
+            self.invalidate_cache(f'email_preferences:{user_id}')
+            return True
+        except Exception as e:
+            logger.error(f"Error updating email preferences: {str(e)}")
+            return False
+
+    def get_user_email(self, user_id: int) -> Optional[str]:
+        """Get a user's email address"""
+        try:
+            row = self.execute_prepared('get_user_email', (user_id,), fetch='one', readonly=True)
+            return row[0] if row else None
+        except Exception as e:
+            logger.error(f"Error getting user email: {str(e)}")
+            return None
+
+    def update_user_email(self, user_id: int, email: str) -> bool:
+        """Change a user's email address"""
+        try:
+            return self.execute_prepared('update_user_email', (email, user_id), fetch=None) == 1
+        except Exception as e:
+            logger.error(f"Error updating user email: {str(e)}")
+            return False
+
     def save_resume(self, user_id: int, resume_text: str, extracted_skills: List[str],
-                   location: str, file_path: str, file_type: str) -> Optional[int]:
+                   location: str, file_path: str, file_type: str,
+                   content_hash: Optional[str] = None) -> Optional[int]:
         """Save resume data to database with caching"""
         try:
             with self.get_cursor() as cur:
                 cur.execute("""
                     INSERT INTO resumes 
-                    (user_id, resume_text, skills, location, file_path, file_type)
-                    VALUES (%s, %s, %s, %s, %s, %s)
+                    (user_id, resume_text, skills, location, file_path, file_type, content_hash)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
                     RETURNING id
-                """, (user_id, resume_text, extracted_skills, location, file_path, file_type))
+                """, (user_id, resume_text, extracted_skills, location, file_path, file_type,
+                      content_hash))
                 result = cur.fetchone()
                 return result[0] if result else None
         except Exception as e:
             logger.error(f"Error saving resume: {str(e)}")
             return None
 
+    def get_referenced_upload_paths(self) -> Optional[Set[str]]:
+        """Upload paths still referenced by resumes or unfinished ingestion jobs, or None on error"""
+        try:
+            paths = set()
+            for batch in self.stream("""
+                SELECT file_path FROM resumes WHERE file_path IS NOT NULL
+                UNION
+                SELECT file_path FROM resume_ingestion_jobs WHERE status IN ('queued', 'processing')
+            """):
+                paths.update(row[0] for row in batch)
+            return paths
+        except Exception as e:
+            logger.error(f"Error getting referenced upload paths: {str(e)}")
+            return None
+
+    def get_resume_by_hash(self, content_hash: str) -> Optional[Dict]:
+        """Get the extracted text and features of a previously uploaded file"""
+        try:
+            with self.get_cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT resume_text, skills, location, file_path, file_type
+                    FROM resumes
+                    WHERE content_hash = %s
+                    ORDER BY created_at DESC
+                    LIMIT 1
+                """, (content_hash,))
+                return cur.fetchone()
+        except Exception as e:
+            logger.error(f"Error looking up resume by hash: {str(e)}")
+            return None
+
+    def get_existing_content_hashes(self, content_hashes: List[str]) -> Set[str]:
+        """Return the subset of content hashes that already have a stored resume"""
+        try:
+            with self.get_cursor() as cur:
+                cur.execute("""
+                    SELECT DISTINCT content_hash FROM resumes
+                    WHERE content_hash = ANY(%s)
+                """, (list(content_hashes),))
+                return {row[0] for row in cur.fetchall()}
+        except Exception as e:
+            logger.error(f"Error looking up content hashes: {str(e)}")
+            raise
+
+    def save_resumes_batch(self, rows: List[tuple]) -> int:
+        """Insert many resumes in one multi-row statement.
+
+        Each row is (user_id, resume_text, skills, location, file_path,
+        file_type, content_hash). Returns the number of rows inserted.
+        """
+        if not rows:
+            return 0
+        try:
+            with self.get_cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO resumes
+                    (user_id, resume_text, skills, location, file_path, file_type, content_hash)
+                    VALUES %s
+                """, rows, page_size=len(rows))
+                return cur.rowcount
+        except Exception as e:
+            logger.error(f"Error saving resume batch: {str(e)}")
+            raise
+
+    def enqueue_resume_ingestion(self, user_id: int, file_name: str, file_path: str,
+                                 file_type: str, content_hash: str) -> Optional[int]:
+        """Queue a stored upload for background parsing and return the job id"""
+        try:
+            with self.get_cursor() as cur:
+                cur.execute("""
+                    INSERT INTO resume_ingestion_jobs
+                    (user_id, file_name, file_path, file_type, content_hash)
+                    VALUES (%s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (user_id, file_name, file_path, file_type, content_hash))
+                result = cur.fetchone()
+                return result[0] if result else None
+        except Exception as e:
+            logger.error(f"Error queueing resume ingestion: {str(e)}")
+            return None
+
+    def claim_resume_ingestion_job(self, max_attempts: int = 3,
+                                   stale_after: int = 600) -> Optional[Dict]:
+        """Claim the oldest pending ingestion job, skipping rows other workers hold.
+
+        Jobs left in 'processing' for longer than ``stale_after`` seconds are
+        assumed to belong to a dead worker and are claimed again, or marked
+        failed once they have used up their attempts.
+        """
+        try:
+            with self.get_cursor(cursor_factory=RealDictCursor) as cur:
+                # Otherwise a worker dying on the last attempt leaves the job processing forever
+                cur.execute("""
+                    UPDATE resume_ingestion_jobs
+                    SET status = 'failed',
+                        error = 'Processing did not finish. Please upload the file again.',
+                        finished_at = CURRENT_TIMESTAMP
+                    WHERE status = 'processing'
+                    AND attempts >= %s
+                    AND started_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                """, (max_attempts, stale_after))
+                if cur.rowcount:
+                    logger.warning(f"Marked {cur.rowcount} abandoned ingestion jobs as failed")
+                cur.execute("""
+                    UPDATE resume_ingestion_jobs
+                    SET status = 'processing',
+                        attempts = attempts + 1,
+                        started_at = CURRENT_TIMESTAMP
+                    WHERE id = (
+                        SELECT id FROM resume_ingestion_jobs
+                        WHERE attempts < %s
+                        AND (status = 'queued'
+                             OR (status = 'processing'
+                                 AND started_at < CURRENT_TIMESTAMP - make_interval(secs => %s)))
+                        ORDER BY created_at
+                        LIMIT 1
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING *
+                """, (max_attempts, stale_after))
+                return cur.fetchone()
+        except Exception as e:
+            logger.error(f"Error claiming resume ingestion job: {str(e)}")
+            return None
+
+    def complete_resume_ingestion_job(self, job_id: int, resume_id: int) -> bool:
+        """Mark an ingestion job as done"""
+        try:
+            with self.get_cursor() as cur:
+                cur.execute("""
+                    UPDATE resume_ingestion_jobs
+                    SET status = 'done', resume_id = %s, error = NULL,
+                        finished_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                """, (resume_id, job_id))
+                return True
+        except Exception as e:
+            logger.error(f"Error completing resume ingestion job: {str(e)}")
+            return False
+
+    def fail_resume_ingestion_job(self, job_id: int, error: str) -> bool:
+        """Mark an ingestion job as failed with a user-facing error"""
+        try:
+            with self.get_cursor() as cur:
+                cur.execute("""
+                    UPDATE resume_ingestion_jobs
+                    SET status = 'failed', error = %s, finished_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                """, (error, job_id))
+                return True
+        except Exception as e:
+            logger.error(f"Error failing resume ingestion job: {str(e)}")
+            return False
+
+    def get_resume_ingestion_job(self, job_id: int) -> Optional[Dict]:
+        """Get an ingestion job's status, with the parsed resume once it is done"""
+        try:
+            with self.get_cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT j.id, j.status, j.error, j.file_name, j.resume_id,
+                           r.resume_text, r.skills, r.location
+                    FROM resume_ingestion_jobs j
+                    LEFT JOIN resumes r ON r.id = j.resume_id
+                    WHERE j.id = %s
+                """, (job_id,))
+                return cur.fetchone()
+        except Exception as e:
+            logger.error(f"Error getting resume ingestion job: {str(e)}")
+            return None
+
+    def ensure_job_partitions(self, months_ahead: int = 3) -> bool:
+        """Create monthly jobs partitions from the current month through months_ahead"""
+        try:
+            with self.get_cursor() as cur:
+                cur.execute("SELECT ensure_jobs_partitions(%s)", (months_ahead,))
+            return True
+        except Exception as e:
+            logger.error(f"Error creating job partitions: {str(e)}")
+            return False
+
+    def archive_job_partitions(self, max_age_days: int = 180) -> List[str]:
+        """Detach monthly jobs partitions older than max_age_days into the jobs_archive schema"""
+        archived = []
+        try:
+            with self.get_cursor() as cur:
+                cur.execute("""
+                    SELECT c.relname
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = 'jobs'::regclass
+                    AND c.relname ~ '^jobs_[0-9]{4}_[0-9]{2}$'
+                    AND to_date(substring(c.relname from 6), 'YYYY_MM') + INTERVAL '1 month'
+                        <= CURRENT_DATE - make_interval(days => %s)
+                    ORDER BY c.relname
+                """, (max_age_days,))
+                partitions = [row[0] for row in cur.fetchall()]
+                for partition in partitions:
+                    # Bookmarks keep their job_ids row and are shown as archived;
+                    # matches only drive notifications and analytics, so they go
+                    cur.execute(f'''
+                        UPDATE job_ids SET archived_at = CURRENT_TIMESTAMP
+                        WHERE id IN (SELECT id FROM "{partition}")
+                    ''')
+                    cur.execute(f'''
+                        DELETE FROM job_matches
+                        WHERE job_id IN (SELECT id FROM "{partition}")
+                    ''')
+                    matches_deleted = cur.rowcount
+                    # The rows stay queryable as jobs_archive.<partition>
+                    cur.execute(f'ALTER TABLE jobs DETACH PARTITION "{partition}"')
+                    cur.execute(f'ALTER TABLE "{partition}" SET SCHEMA jobs_archive')
+                    archived.append(partition)
+                    logger.info(f"Archiving {partition} removed {matches_deleted} job matches")
+                if archived:
+                    # DETACH fires no triggers, so announce the change for the query caches
+                    cur.execute("SELECT pg_notify('table_changes', 'jobs')")
+            for partition in archived:
+                logger.info(f"Archived job partition {partition}")
+            self.invalidate_cache('jobs')
+            return archived
+        except Exception as e:
+            logger.error(f"Error archiving job partitions: {str(e)}")
+            return []
+
+    def refresh_analytics_views(self) -> bool:
+        """Refresh the dashboard's materialized views without blocking readers"""
+        try:
+            with self.get_cursor() as cur:
+                # Only one process refreshes at a time; the others skip this round
+                cur.execute("SELECT pg_try_advisory_xact_lock(hashtext('refresh_analytics_views'))")
+                if not cur.fetchone()[0]:
+                    logger.info("Analytics views are already being refreshed, skipping")
+                    return False
+                for view in ANALYTICS_VIEWS:
+                    started = time.monotonic()
+                    cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+                    logger.info(f"Refreshed {view} in {time.monotonic() - started:.2f}s")
+            return True
+        except Exception as e:
+            logger.error(f"Error refreshing analytics views: {str(e)}")
+            return False
+
     def __del__(self):
         """Cleanup pool on object destruction"""
         try:
             if hasattr(self, '_pool') and self._pool is not None:
                 self._pool.closeall()
+            for replica in getattr(self, '_replicas', []):
+                replica['pool'].closeall()
         except Exception as e:
             logger.error(f"Error closing connection pool: {str(e)}")
+
+
+# Hot lookups run through execute_prepared
+# Saved Jobs list: a lean projection with an excerpt; full descriptions load on demand
+BOOKMARKS_PROJECTION = """
+    SELECT b.id AS bookmark_id, b.created_at AS bookmarked_at,
+           k.id, j.title, j.company, j.location, j.url,
+           left(j.description, 280) AS excerpt,
+           length(j.description) > 280 AS is_truncated,
+           k.archived_at IS NOT NULL AS is_archived,
+           jm.match_score
+    FROM bookmarks b
+    JOIN job_ids k ON k.id = b.job_id
+    -- Archived jobs have left the jobs table; their bookmarks are listed as such
+    LEFT JOIN jobs j ON j.id = k.id AND j.posted_at = k.posted_at
+    LEFT JOIN job_matches jm ON jm.user_id = b.user_id AND jm.job_id = b.job_id
+    WHERE b.user_id = %s
+"""
+Database.register_statement('get_bookmarks_first', BOOKMARKS_PROJECTION + """
+    ORDER BY b.created_at DESC, b.id DESC
+    LIMIT %s
+""")
+Database.register_statement('get_bookmarks_after', BOOKMARKS_PROJECTION + """
+    AND (b.created_at, b.id) < (%s::timestamp, %s)
+    ORDER BY b.created_at DESC, b.id DESC
+    LIMIT %s
+""")
+Database.register_statement('get_user_activity', """
+    SELECT COUNT(*) AS total_matches,
+           COALESCE(AVG(match_score), 0) AS avg_match,
+           (SELECT COUNT(*) FROM bookmarks WHERE user_id = %s) AS bookmarked
+    FROM job_matches
+    WHERE user_id = %s
+""")
+Database.register_statement('save_bookmark', """
+    INSERT INTO bookmarks (user_id, job_id)
+    SELECT %s, id FROM job_ids WHERE id = %s AND archived_at IS NULL
+    ON CONFLICT (user_id, job_id) DO NOTHING
+""")
+Database.register_statement('delete_bookmark', """
+    DELETE FROM bookmarks
+    WHERE user_id = %s AND job_id = %s
+""")
+Database.register_statement('get_job_description', """
+    SELECT j.description
+    FROM job_ids k
+    JOIN jobs j ON j.id = k.id AND j.posted_at = k.posted_at
+    WHERE k.id = %s
+""")
+Database.register_statement('get_email_preferences', """
+    SELECT is_enabled, min_match_score
+    FROM email_preferences
+    WHERE user_id = %s
+""")
+Database.register_statement('upsert_email_preferences', """
+    INSERT INTO email_preferences (user_id, is_enabled, min_match_score)
+    VALUES (%s, %s, %s)
+    ON CONFLICT (user_id) DO UPDATE
+    SET is_enabled = EXCLUDED.is_enabled,
+        min_match_score = EXCLUDED.min_match_score
+""")
+Database.register_statement('get_user_email', """
+    SELECT email FROM users WHERE id = %s
+""")
+Database.register_statement('update_user_email', """
+    UPDATE users SET email = %s WHERE id = %s
+""")
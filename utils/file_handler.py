@@ -1,13 +1,30 @@
 import os
-import uuid
+import io
+import time
+import lzma
+import hashlib
+import logging
+import tempfile
 import magic
-from datetime import datetime
-from werkzeug.utils import secure_filename
+from typing import Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# libmagic only needs the leading bytes to identify PDF and DOCX files
+SNIFF_BYTES = 8192
+WRITE_CHUNK_SIZE = 1024 * 1024
+ARCHIVE_DIR_NAME = "archive"
+ARCHIVE_SUFFIX = ".xz"
 
 class FileHandler:
     def __init__(self):
         self.upload_dir = "uploads"
+        self.archive_dir = os.path.join(self.upload_dir, ARCHIVE_DIR_NAME)
         self.allowed_extensions = {'pdf', 'docx'}
+        self.allowed_mime_types = {
+            'application/pdf': 'pdf',
+            'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx'
+        }
         
         # Create uploads directory if it doesn't exist
         if not os.path.exists(self.upload_dir):
@@ -17,31 +34,177 @@ class FileHandler:
         return '.' in filename and \
             filename.rsplit('.', 1)[1].lower() in self.allowed_extensions
 
-    def save_file(self, file):
+    def compute_hash(self, buffer) -> str:
+        """Compute the SHA-256 content hash used as the storage key"""
+        return hashlib.sha256(buffer).hexdigest()
+
+    def get_path_for_hash(self, content_hash: str, extension: str) -> str:
+        """Get the content-addressed path for a file, fanned out by hash prefix"""
+        return os.path.join(self.upload_dir, content_hash[:2], f"{content_hash}.{extension}")
+
+    def sniff_mime_type(self, buffer) -> str:
+        """Detect the MIME type from the leading bytes of a buffer"""
+        return magic.from_buffer(bytes(memoryview(buffer)[:SNIFF_BYTES]), mime=True)
+
+    def validate_buffer(self, buffer, filename: str) -> Tuple[bool, Optional[str]]:
+        """Validate file extension and content type before anything is written"""
+        if not self.allowed_file(filename):
+            return False, "File type not allowed. Please upload PDF or DOCX files only."
+
+        mime_type = self.sniff_mime_type(buffer)
+        if mime_type not in self.allowed_mime_types:
+            return False, "Invalid file type. Please upload a PDF or DOCX file."
+
+        if self.allowed_mime_types[mime_type] != filename.rsplit('.', 1)[1].lower():
+            return False, "File extension does not match the actual file type."
+
+        return True, None
+
+    def save_buffer(self, buffer, filename: str, content_hash: Optional[str] = None):
+        """Write a validated buffer to the content-addressed store"""
+        view = memoryview(buffer)
+        if content_hash is None:
+            content_hash = self.compute_hash(view)
+
+        # Store the file under its content hash so identical uploads share one copy
+        extension = filename.rsplit('.', 1)[1].lower()
+        file_path = self.get_path_for_hash(content_hash, extension)
+        if self.file_exists(file_path):
+            return file_path, None
+
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # A unique temp file per save, so concurrent saves of the same content never share one
+        fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(file_path),
+            prefix=os.path.basename(file_path) + ".",
+            suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                # Slicing a memoryview does not copy the underlying bytes
+                for offset in range(0, len(view), WRITE_CHUNK_SIZE):
+                    f.write(view[offset:offset + WRITE_CHUNK_SIZE])
+            os.chmod(temp_path, 0o644)
+            # Publish atomically so a partial write is never mistaken for a stored file
+            os.replace(temp_path, file_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return file_path, None
+
+    def save_file(self, file, content_hash=None):
         if not file:
             return None, "No file provided"
 
-        if not self.allowed_file(file.name):
-            return None, "File type not allowed. Please upload PDF or DOCX files only."
+        buffer = file.getbuffer()
+        is_valid, error = self.validate_buffer(buffer, file.name)
+        if not is_valid:
+            return None, error
 
-        # Create a secure filename with timestamp and UUID
-        original_filename = secure_filename(file.name)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        filename = f"{timestamp}_{unique_id}_{original_filename}"
-        
-        file_path = os.path.join(self.upload_dir, filename)
-        
-        # Save the file
-        with open(file_path, "wb") as f:
-            f.write(file.getvalue())
+        return self.save_buffer(buffer, file.name, content_hash)
 
-        # Verify file type using python-magic
-        file_type = magic.from_file(file_path, mime=True)
-        allowed_mime_types = ['application/pdf', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']
-        
-        if file_type not in allowed_mime_types:
-            os.remove(file_path)
-            return None, "Invalid file content. Please upload valid PDF or DOCX files only."
+    def get_archive_path(self, file_path: str) -> str:
+        """Get the compressed archive location for a stored upload"""
+        relative_path = os.path.relpath(file_path, self.upload_dir)
+        return os.path.join(self.archive_dir, relative_path + ARCHIVE_SUFFIX)
 
-        return file_path, None
+    def file_exists(self, file_path: str) -> bool:
+        """Check whether an upload is stored, in either the hot or archive tier"""
+        return os.path.exists(file_path) or os.path.exists(self.get_archive_path(file_path))
+
+    def open_file(self, file_path: str):
+        """Open a stored upload for reading, decompressing it if it was archived"""
+        if os.path.exists(file_path):
+            return open(file_path, "rb")
+
+        archive_path = self.get_archive_path(file_path)
+        if os.path.exists(archive_path):
+            # Parsers seek around the file, so decompress into memory once
+            with lzma.open(archive_path, "rb") as f:
+                return io.BytesIO(f.read())
+
+        raise FileNotFoundError(file_path)
+
+    def archive_old_files(self, max_age_days: int = 30,
+                          retention_days: Optional[int] = None,
+                          referenced_paths: Optional[Set[str]] = None) -> Dict[str, int]:
+        """Compress uploads older than max_age_days into the archive tier.
+
+        Archived files older than retention_days are deleted when it is set,
+        except those whose upload path is in referenced_paths. Returns counts
+        and byte totals for the run.
+        """
+        report = {
+            'files_archived': 0,
+            'files_deleted': 0,
+            'files_retained': 0,
+            'bytes_before': 0,
+            'bytes_after': 0,
+            'reclaimed_bytes': 0,
+            'errors': 0
+        }
+        now = time.time()
+        archive_cutoff = now - max_age_days * 86400
+
+        for root, dirs, files in os.walk(self.upload_dir):
+            # Never descend into the archive tier itself
+            dirs[:] = [d for d in dirs if os.path.join(root, d) != self.archive_dir]
+            for name in files:
+                file_path = os.path.join(root, name)
+                temp_path = None
+                try:
+                    stat = os.stat(file_path)
+                    if stat.st_mtime >= archive_cutoff:
+                        continue
+                    if name.endswith(".tmp"):
+                        # Left behind by an interrupted save
+                        os.remove(file_path)
+                        report['reclaimed_bytes'] += stat.st_size
+                        continue
+
+                    archive_path = self.get_archive_path(file_path)
+                    os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+                    temp_path = f"{archive_path}.tmp"
+                    with open(file_path, "rb") as src, lzma.open(temp_path, "wb") as dst:
+                        while True:
+                            chunk = src.read(WRITE_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            dst.write(chunk)
+                    os.replace(temp_path, archive_path)
+                    # Keep the upload time so retention counts from the original upload
+                    os.utime(archive_path, (stat.st_atime, stat.st_mtime))
+                    os.remove(file_path)
+
+                    archived_size = os.path.getsize(archive_path)
+                    report['files_archived'] += 1
+                    report['bytes_before'] += stat.st_size
+                    report['bytes_after'] += archived_size
+                    report['reclaimed_bytes'] += stat.st_size - archived_size
+                except Exception as e:
+                    logger.error(f"Error archiving {file_path}: {str(e)}")
+                    report['errors'] += 1
+                    if temp_path and os.path.exists(temp_path):
+                        os.remove(temp_path)
+
+        if retention_days is not None:
+            retention_cutoff = now - retention_days * 86400
+            # Files the database still points at stay readable through open_file
+            keep = {self.get_archive_path(path) for path in referenced_paths or ()}
+            for root, _, files in os.walk(self.archive_dir):
+                for name in files:
+                    archive_path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(archive_path)
+                        if stat.st_mtime < retention_cutoff and archive_path in keep:
+                            report['files_retained'] += 1
+                        elif stat.st_mtime < retention_cutoff:
+                            os.remove(archive_path)
+                            report['files_deleted'] += 1
+                            report['reclaimed_bytes'] += stat.st_size
+                    except Exception as e:
+                        logger.error(f"Error removing {archive_path}: {str(e)}")
+                        report['errors'] += 1
+
+        return report
@@ -0,0 +1,86 @@
+import logging
+import threading
+import time
+from typing import Dict
+from utils.database import Database
+from utils.file_handler import FileHandler
+from utils.nlp_processor import NLPProcessor
+from utils.resume_parser import extract_text
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def process_ingestion_job(db: Database, nlp: NLPProcessor, job: Dict) -> None:
+    """
+    Parse a queued resume upload and save the extracted data
+    """
+    try:
+        # Another job may have parsed the same file since this one was queued
+        existing = db.get_resume_by_hash(job['content_hash'])
+        if existing:
+            resume_text = existing['resume_text']
+            skills = list(existing['skills'] or [])
+            location = existing['location']
+        else:
+            with FileHandler().open_file(job['file_path']) as f:
+                resume_text, error = extract_text(f, job['file_type'])
+            if error:
+                db.fail_resume_ingestion_job(job['id'], error)
+                return
+            processed_data = nlp.process_text(resume_text)
+            skills = list(processed_data['skills'])
+            location = processed_data['location']
+
+        resume_id = db.save_resume(
+            job['user_id'],
+            resume_text,
+            skills,
+            location,
+            job['file_path'],
+            job['file_type'],
+            content_hash=job['content_hash']
+        )
+        if not resume_id:
+            db.fail_resume_ingestion_job(job['id'], "Failed to save resume to database")
+            return
+
+        db.complete_resume_ingestion_job(job['id'], resume_id)
+        logger.info(f"Ingested resume job {job['id']} as resume {resume_id}")
+
+    except Exception as e:
+        logger.error(f"Error processing ingestion job {job['id']}: {str(e)}")
+        db.fail_resume_ingestion_job(job['id'], f"Error processing resume: {str(e)}")
+
+def run_ingestion_loop(poll_interval: float = 1.0) -> None:
+    """
+    Claim and process ingestion jobs until the process exits
+    """
+    db = Database()
+    nlp = NLPProcessor()
+    while True:
+        try:
+            job = db.claim_resume_ingestion_job()
+            if job:
+                process_ingestion_job(db, nlp, job)
+                continue
+        except Exception as e:
+            logger.error(f"Critical error in ingestion worker: {str(e)}")
+        time.sleep(poll_interval)
+
+def setup_ingestion_worker(num_workers: int = 2):
+    """
+    Set up resume ingestion worker threads
+    """
+    for i in range(num_workers):
+        thread = threading.Thread(
+            target=run_ingestion_loop,
+            name=f"ingestion-worker-{i}",
+            daemon=True
+        )
+        thread.start()
+    logger.info(f"Resume ingestion worker initialized with {num_workers} threads")
+
+if __name__ == "__main__":
+    # Run the workers in their own process, off the Streamlit server
+    run_ingestion_loop()
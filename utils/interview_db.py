@@ -1,37 +1,61 @@
-from typing import List, Dict, Optional, Any
+from functools import partial
+from typing import Iterator, List, Dict, Optional, Any
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import datetime
+from utils.database import Database
+from utils.question_pool import QuestionPool
+
+# GROUPING SETS: () is the overall row, then one row per category and per day.
+# LEFT JOIN so responses to deleted questions still count toward the totals.
+Database.register_statement('get_user_progress', """
+    SELECT
+        GROUPING(q.category) = 0 AS by_category,
+        GROUPING(DATE_TRUNC('day', r.created_at)) = 0 AS by_day,
+        q.category,
+        DATE_TRUNC('day', r.created_at) AS practice_date,
+        COUNT(*) AS total_responses,
+        AVG(r.score) AS avg_score,
+        MAX(r.score) AS highest_score,
+        COUNT(DISTINCT r.question_id) AS unique_questions,
+        MAX(r.created_at) AS last_practice
+    FROM interview_responses r
+    LEFT JOIN interview_questions q ON r.question_id = q.id
+    WHERE r.user_id = %s
+    GROUP BY GROUPING SETS ((), (q.category), (DATE_TRUNC('day', r.created_at)))
+""")
+
+Database.register_statement('get_questions_by_ids', """
+    SELECT * FROM interview_questions WHERE id = ANY(%s::int[])
+""")
+
+def load_questions(db, batch_size: int = 1000) -> Iterator[Dict]:
+    """Yield every interview question"""
+    for batch in db.stream("SELECT * FROM interview_questions", batch_size=batch_size,
+                           cursor_factory=RealDictCursor):
+        yield from batch
+
+def fetch_questions(db, ids: List[int]) -> List[Dict]:
+    """Get interview questions by id"""
+    return db.execute_prepared('get_questions_by_ids', (list(ids),),
+                               cursor_factory=RealDictCursor, readonly=True)
+
+def create_question_pool(db, **kwargs) -> QuestionPool:
+    """A question pool that loads from and fetches through db"""
+    return QuestionPool(partial(load_questions, db), fetch=partial(fetch_questions, db), **kwargs)
 
 class InterviewDB:
-    def __init__(self, db):
+    def __init__(self, db, pool: Optional[QuestionPool] = None):
         self.db = db
+        # Questions are sampled in memory instead of ORDER BY RANDOM() per request
+        self.pool = pool if pool is not None else create_question_pool(db)
         
     def get_questions(self, category: Optional[str] = None, 
                      difficulty: Optional[str] = None,
                      limit: Optional[int] = None) -> List[Dict]:
         """Get interview questions with optional filtering"""
         try:
-            with self.db.get_cursor(cursor_factory=RealDictCursor) as cur:
-                query = "SELECT * FROM interview_questions WHERE 1=1"
-                params = []
-                
-                if category:
-                    query += " AND category = %s"
-                    params.append(category)
-                    
-                if difficulty:
-                    query += " AND difficulty = %s"
-                    params.append(difficulty)
-                    
-                query += " ORDER BY RANDOM()"
-                
-                if limit:
-                    query += " LIMIT %s"
-                    params.append(limit)
-                    
-                cur.execute(query, tuple(params) if params else None)
-                return cur.fetchall()
+            return self.pool.sample(category, difficulty, limit)
         except Exception as e:
             print(f"Error getting interview questions: {str(e)}")
             return []
@@ -39,18 +63,7 @@ class InterviewDB:
     def get_questions_by_skills(self, skills: List[str], limit: Optional[int] = None) -> List[Dict]:
         """Get questions that match the given skills"""
         try:
-            with self.db.get_cursor(cursor_factory=RealDictCursor) as cur:
-                query = """
-                    SELECT * FROM interview_questions
-                    WHERE skill_tags && %s
-                    ORDER BY RANDOM()
-                """
-                if limit:
-                    query += " LIMIT %s"
-                    cur.execute(query, (skills, limit))
-                else:
-                    cur.execute(query, (skills,))
-                return cur.fetchall()
+            return self.pool.sample_by_skills(skills, limit)
         except Exception as e:
             print(f"Error getting questions by skills: {str(e)}")
             return []
@@ -59,18 +72,7 @@ class InterviewDB:
                                         limit: Optional[int] = None) -> List[Dict]:
         """Get questions for a specific experience level"""
         try:
-            with self.db.get_cursor(cursor_factory=RealDictCursor) as cur:
-                query = """
-                    SELECT * FROM interview_questions
-                    WHERE experience_level = %s
-                    ORDER BY RANDOM()
-                """
-                if limit:
-                    query += " LIMIT %s"
-                    cur.execute(query, (experience_level, limit))
-                else:
-                    cur.execute(query, (experience_level,))
-                return cur.fetchall()
+            return self.pool.sample_by_experience_level(experience_level, limit)
         except Exception as e:
             print(f"Error getting questions by experience level: {str(e)}")
             return []
@@ -96,53 +98,43 @@ class InterviewDB:
     def get_user_progress(self, user_id: int) -> Dict[str, Any]:
         """Get user's interview practice progress and stats"""
         try:
-            with self.db.get_cursor(cursor_factory=RealDictCursor) as cur:
-                # Get overall stats
-                cur.execute("""
-                    SELECT 
-                        COUNT(*) as total_responses,
-                        AVG(score) as avg_score,
-                        MAX(score) as highest_score,
-                        COUNT(DISTINCT question_id) as unique_questions,
-                        MAX(created_at) as last_practice
-                    FROM interview_responses
-                    WHERE user_id = %s
-                """, (user_id,))
-                stats = cur.fetchone()
-                
-                # Get category breakdown
-                cur.execute("""
-                    SELECT 
-                        q.category,
-                        COUNT(*) as attempts,
-                        AVG(r.score) as avg_score,
-                        MAX(r.score) as highest_score
-                    FROM interview_responses r
-                    JOIN interview_questions q ON r.question_id = q.id
-                    WHERE r.user_id = %s
-                    GROUP BY q.category
-                    ORDER BY avg_score DESC
-                """, (user_id,))
-                categories = cur.fetchall()
-                
-                # Get recent improvement trend
-                cur.execute("""
-                    SELECT 
-                        DATE_TRUNC('day', created_at) as practice_date,
-                        AVG(score) as avg_score
-                    FROM interview_responses
-                    WHERE user_id = %s
-                    GROUP BY DATE_TRUNC('day', created_at)
-                    ORDER BY practice_date DESC
-                    LIMIT 10
-                """, (user_id,))
-                improvement_trend = cur.fetchall()
-                
-                return {
-                    'stats': stats,
-                    'categories': categories,
-                    'improvement_trend': improvement_trend
-                }
+            # Overall stats, category breakdown and daily trend in one pass
+            rows = self.db.execute_prepared(
+                'get_user_progress', (user_id,),
+                cursor_factory=RealDictCursor, readonly=True
+            )
+            stats = None
+            categories = []
+            improvement_trend = []
+            for row in rows:
+                if not row['by_category'] and not row['by_day']:
+                    stats = {key: row[key] for key in (
+                        'total_responses', 'avg_score', 'highest_score',
+                        'unique_questions', 'last_practice'
+                    )}
+                elif row['by_category']:
+                    if row['category'] is None:
+                        # Responses whose question was deleted have no category
+                        continue
+                    categories.append({
+                        'category': row['category'],
+                        'attempts': row['total_responses'],
+                        'avg_score': row['avg_score'],
+                        'highest_score': row['highest_score']
+                    })
+                else:
+                    improvement_trend.append({
+                        'practice_date': row['practice_date'],
+                        'avg_score': row['avg_score']
+                    })
+            
+            categories.sort(key=lambda c: c['avg_score'] or 0, reverse=True)
+            improvement_trend.sort(key=lambda t: t['practice_date'], reverse=True)
+            return {
+                'stats': stats,
+                'categories': categories,
+                'improvement_trend': improvement_trend[:10]
+            }
         except Exception as e:
             print(f"Error getting user progress: {str(e)}")
             return {
@@ -151,24 +143,31 @@ class InterviewDB:
                 'improvement_trend': []
             }
 
-    def get_user_responses(self, user_id: int) -> List[Dict]:
-        """Get user's previous responses with question details"""
+    def get_user_responses(self, user_id: int, since: Optional[datetime] = None,
+                           batch_size: int = 100) -> Iterator[Dict]:
+        """Yield user's previous responses with question details, newest first"""
         try:
-            with self.db.get_cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute("""
-                    SELECT 
-                        r.*,
-                        q.question,
-                        q.category,
-                        q.difficulty,
-                        q.skill_tags,
-                        q.experience_level
-                    FROM interview_responses r
-                    JOIN interview_questions q ON r.question_id = q.id
-                    WHERE r.user_id = %s
-                    ORDER BY r.created_at DESC
-                """, (user_id,))
-                return cur.fetchall()
+            query = """
+                SELECT 
+                    r.*,
+                    q.question,
+                    q.category,
+                    q.difficulty,
+                    q.skill_tags,
+                    q.experience_level
+                FROM interview_responses r
+                JOIN interview_questions q ON r.question_id = q.id
+                WHERE r.user_id = %s
+            """
+            params = [user_id]
+            if since:
+                query += " AND r.created_at > %s"
+                params.append(since)
+            query += " ORDER BY r.created_at DESC"
+            
+            for batch in self.db.stream(query, tuple(params), batch_size=batch_size,
+                                        cursor_factory=RealDictCursor):
+                yield from batch
         except Exception as e:
             print(f"Error getting user responses: {str(e)}")
-            return []
+            return
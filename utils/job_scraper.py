@@ -1,5 +1,7 @@
 import logging
 import json
+import csv
+import io
 from datetime import datetime
 from typing import List, Dict, Optional
 from utils.database import Database
@@ -32,32 +34,76 @@ class JobScraper:
             columns = [desc[0] for desc in cur.description]
             return [dict(zip(columns, row)) for row in cur.fetchall()]
     
-    def save_jobs(self, jobs: List[Dict], source_id: int) -> None:
-        """Save scraped jobs to database with batch processing"""
+    def save_jobs(self, jobs: List[Dict], source_id: int) -> List[int]:
+        """Bulk-load scraped jobs via COPY and return the ids of newly inserted rows"""
+        if not jobs:
+            return []
         try:
+            # Serialize the batch as CSV; empty external ids/urls load as NULL
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            scraped_at = datetime.now()
+            for job in jobs:
+                writer.writerow([
+                    job['title'], job['company'], job['location'],
+                    job['description'], source_id, job.get('external_id') or None,
+                    job.get('url') or None, scraped_at
+                ])
+            buffer.seek(0)
+
             with self.db.get_cursor() as cur:
-                # Prepare batch insert
-                args = []
-                for job in jobs:
-                    args.extend([
-                        job['title'], job['company'], job['location'],
-                        job['description'], source_id, job['external_id'],
-                        job['url'], datetime.now()
-                    ])
-                
                 cur.execute("""
-                    INSERT INTO jobs 
+                    CREATE TEMP TABLE jobs_staging (
+                        title VARCHAR(255),
+                        company VARCHAR(255),
+                        location VARCHAR(255),
+                        description TEXT,
+                        source_id INTEGER,
+                        external_id VARCHAR(255),
+                        url VARCHAR(1024),
+                        posted_at TIMESTAMP
+                    ) ON COMMIT DROP
+                """)
+                cur.copy_expert("""
+                    COPY jobs_staging
                     (title, company, location, description, source_id, external_id, url, posted_at)
-                    VALUES %s
-                    ON CONFLICT ON CONSTRAINT unique_external_job DO NOTHING
-                """, args)
-                
-                self.db.conn.commit()
-                logger.info(f"Successfully saved {len(jobs)} jobs from source {source_id}")
-                
+                    FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (title, company, location, description))
+                """, buffer)
+                # jobs is partitioned, so (source_id, external_id) is claimed in
+                # job_external_keys and only rows that win a new key are inserted
+                cur.execute("""
+                    WITH new_keys AS (
+                        INSERT INTO job_external_keys (source_id, external_id)
+                        SELECT DISTINCT source_id, external_id
+                        FROM jobs_staging
+                        WHERE source_id IS NOT NULL AND external_id IS NOT NULL
+                        ON CONFLICT DO NOTHING
+                        RETURNING source_id, external_id
+                    )
+                    INSERT INTO jobs
+                    (title, company, location, description, source_id, external_id, url, posted_at)
+                    SELECT DISTINCT ON (s.source_id, s.external_id)
+                           s.title, s.company, s.location, s.description,
+                           s.source_id, s.external_id, s.url, s.posted_at
+                    FROM jobs_staging s
+                    JOIN new_keys k ON k.source_id = s.source_id AND k.external_id = s.external_id
+                    UNION ALL
+                    SELECT title, company, location, description, source_id, external_id, url, posted_at
+                    FROM jobs_staging
+                    WHERE source_id IS NULL OR external_id IS NULL
+                    RETURNING id
+                """)
+                job_ids = [row[0] for row in cur.fetchall()]
+
+            logger.info(
+                f"Saved {len(job_ids)} new jobs from source {source_id} "
+                f"({len(jobs) - len(job_ids)} already known)"
+            )
+            return job_ids
+
         except Exception as e:
             logger.error(f"Error saving jobs: {str(e)}")
-            self.db.conn.rollback()
+            return []
     
     def update_last_scraped(self, source_id: int) -> None:
         """Update last scraped timestamp for a source"""
@@ -68,10 +114,8 @@ class JobScraper:
                     SET last_scraped_at = CURRENT_TIMESTAMP 
                     WHERE id = %s
                 """, (source_id,))
-                self.db.conn.commit()
         except Exception as e:
             logger.error(f"Error updating last scraped timestamp: {str(e)}")
-            self.db.conn.rollback()
 
     def exponential_backoff(self, attempt: int, base_delay: float = 1.0, max_delay: float = 60.0) -> float:
         """Calculate exponential backoff delay"""
@@ -129,8 +173,9 @@ class JobScraper:
         
         return jobs
     
-    def scrape_jobs(self) -> None:
-        """Main job scraping function with optimizations"""
+    def scrape_jobs(self) -> List[int]:
+        """Main job scraping function; returns the ids of jobs inserted this cycle"""
+        new_job_ids = []
         try:
             sources = self.get_active_sources()
             logger.info(f"Found {len(sources)} active sources to scrape")
@@ -147,7 +192,7 @@ class JobScraper:
                     
                     # Save jobs and update timestamp
                     if jobs:
-                        self.save_jobs(jobs, source['id'])
+                        new_job_ids.extend(self.save_jobs(jobs, source['id']))
                         self.update_last_scraped(source['id'])
                         logger.info(f"Successfully scraped {len(jobs)} jobs from {source['name']}")
                     
@@ -163,3 +208,4 @@ class JobScraper:
         finally:
             if self.selenium_scraper:
                 self.selenium_scraper.close()
+        return new_job_ids
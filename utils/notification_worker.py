@@ -1,5 +1,8 @@
+import asyncio
 import logging
-from utils.database import Database
+import os
+from typing import Dict
+from utils.async_database import AsyncDatabase
 from utils.email_notifier import EmailNotifier
 import time
 import threading
@@ -8,47 +11,61 @@ import threading
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def process_notifications():
+async def process_user_notifications(db: AsyncDatabase, email_notifier: EmailNotifier,
+                                     semaphore: asyncio.Semaphore, user: Dict) -> None:
     """
-    Process pending job match notifications
+    Send pending job match notifications for one user
+    """
+    async with semaphore:
+        email = user['email']
+        try:
+            # Get unnotified matches above the minimum score
+            matches = await db.get_unnotified_matches(user['id'], user['min_match_score'])
+            if not matches:
+                return
+
+            logger.info(f"Processing {len(matches)} matches for user {email}")
+            # SendGrid's client is blocking, so send from a worker thread
+            success, message = await asyncio.to_thread(
+                email_notifier.send_job_match_notification, email, matches
+            )
+            if success:
+                # Mark matches as notified
+                job_ids = [job['id'] for job in matches]
+                await db.mark_matches_as_notified(user['id'], job_ids)
+                logger.info(f"Successfully processed notifications for user {email}")
+            else:
+                logger.error(f"Failed to send notifications to user {email}: {message}")
+
+        except Exception as e:
+            logger.error(f"Error processing notifications for user {email}: {str(e)}")
+
+async def process_notifications_async(concurrency: int = 50) -> None:
+    """
+    Process pending job match notifications, overlapping users' DB and email calls
     """
     try:
-        db = Database()
         email_notifier = EmailNotifier()
-        
-        # Get all users with email notifications enabled
-        with db.conn.cursor() as cur:
-            cur.execute("""
-                SELECT DISTINCT u.id, u.email, ep.min_match_score
-                FROM users u
-                JOIN email_preferences ep ON u.id = ep.user_id
-                WHERE ep.is_enabled = true
-            """)
-            users = cur.fetchall()
-        
-        for user_id, email, min_score in users:
-            try:
-                # Get unnotified matches above the minimum score
-                matches = db.get_unnotified_matches(user_id, min_score)
-                
-                if matches:
-                    logger.info(f"Processing {len(matches)} matches for user {email}")
-                    # Send email notification
-                    if email_notifier.send_job_match_notification(email, matches):
-                        # Mark matches as notified
-                        job_ids = [job['id'] for job in matches]
-                        db.mark_matches_as_notified(user_id, job_ids)
-                        logger.info(f"Successfully processed notifications for user {email}")
-                    else:
-                        logger.error(f"Failed to send notifications to user {email}")
-                        
-            except Exception as e:
-                logger.error(f"Error processing notifications for user {email}: {str(e)}")
-                continue
-                
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async with AsyncDatabase() as db:
+            # Get all users with email notifications enabled
+            users = await db.get_notification_recipients()
+            await asyncio.gather(*(
+                process_user_notifications(db, email_notifier, semaphore, user)
+                for user in users
+            ))
+
     except Exception as e:
         logger.error(f"Error in notification processing: {str(e)}")
 
+def process_notifications():
+    """
+    Process pending job match notifications
+    """
+    concurrency = int(os.environ.get('NOTIFICATION_CONCURRENCY', 50))
+    asyncio.run(process_notifications_async(concurrency))
+
 def setup_notification_worker():
     """
     Set up the notification worker to run periodically
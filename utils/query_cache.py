@@ -0,0 +1,171 @@
+import copy
+import select
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Channel the table_change_notify triggers publish on; see schema_updates_cache.sql
+CACHE_CHANNEL = 'table_changes'
+
+class QueryCache:
+    """Read-through cache of query results invalidated by table-level tags.
+
+    Entries are keyed by query fingerprint and parameters and tagged with
+    the tables they read, either whole tables ("jobs") or one user's rows
+    ("bookmarks:42"). A change notification for a table evicts both the
+    table tag and the matching per-row tag. Results loaded within
+    ``settle_time`` seconds of an invalidation are served but not stored,
+    so a lagging replica cannot re-cache data that just changed.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600, settle_time: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.settle_time = settle_time
+        # Only serve from the cache while change notifications are arriving
+        self.active = False
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self._tags: Dict[str, set] = {}
+        self._invalidated_at: Dict[str, float] = {}
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get_or_load(self, key, tags: Iterable[str], loader: Callable):
+        """Return the cached result for key, loading and storing it on a miss"""
+        if not self.active:
+            return loader()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['expires_at'] > now:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return copy.deepcopy(entry['value'])
+            self._stats['misses'] += 1
+
+        tags = tuple(tags)
+        started = time.monotonic()
+        value = loader()
+        with self._lock:
+            # Skip storing if a tag was invalidated while (or just before) loading
+            fresh = all(
+                self._invalidated_at.get(tag, float('-inf')) < started - self.settle_time
+                for tag in tags
+            )
+            if fresh and self.active:
+                self._store(key, tags, value)
+        return copy.deepcopy(value)
+
+    def _store(self, key, tags, value) -> None:
+        self._remove(key)
+        self._entries[key] = {
+            'value': value,
+            'tags': tags,
+            'expires_at': time.monotonic() + self.ttl
+        }
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats['evictions'] += 1
+
+    def _remove(self, key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry['tags']:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, payload: str) -> int:
+        """Evict entries for a change notification ("table" or "table:key")"""
+        tags = {payload, payload.split(':', 1)[0]}
+        now = time.monotonic()
+        evicted = 0
+        with self._lock:
+            self._stats['invalidations'] += 1
+            if ':' not in payload:
+                # A table-wide change (e.g. TRUNCATE) covers every per-row tag too
+                tags.update(tag for tag in self._tags if tag.startswith(payload + ':'))
+            for tag in tags:
+                self._invalidated_at[tag] = now
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), active=self.active)
+
+class CacheInvalidationListener:
+    """Background thread that LISTENs for table changes and evicts cache entries.
+
+    Uses its own autocommit connection; while it is disconnected the cache
+    is bypassed and emptied, since notifications may have been missed.
+    """
+
+    def __init__(self, cache: QueryCache, connect: Callable, channel: str = CACHE_CHANNEL,
+                 poll_interval: float = 5.0):
+        self.cache = cache
+        self.connect = connect
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='query-cache-listener', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        backoff = 1
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self.connect()
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {self.channel}")
+                self.cache.active = True
+                backoff = 1
+                logger.info(f"Query cache listening on {self.channel}")
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.cache.invalidate(conn.notifies.pop(0).payload)
+            except Exception as e:
+                logger.error(f"Query cache listener error: {str(e)}")
+            finally:
+                self.cache.active = False
+                self.cache.clear()
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 60)
@@ -0,0 +1,243 @@
+import os
+import re
+import json
+import time
+import random
+import bisect
+import threading
+import logging
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_DATA_MODIFYING = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE)\b", re.IGNORECASE)
+_LOCKING_READ = re.compile(r"\bFOR\s+(UPDATE|NO\s+KEY\s+UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE)
+
+def is_read_query(query) -> bool:
+    """Whether a statement only reads: a SELECT or a WITH query without data-modifying parts"""
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', errors='replace')
+    text = _STRING_LITERAL.sub("''", str(query)).lstrip().lstrip('(')
+    head = text.split(None, 1)[0].upper() if text else ''
+    if head not in ('SELECT', 'WITH'):
+        return False
+    return not (_DATA_MODIFYING.search(text) or _LOCKING_READ.search(text))
+
+@lru_cache(maxsize=2048)
+def fingerprint(query) -> str:
+    """Normalize a statement so executions differing only in literals group together"""
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', errors='replace')
+    text = _STRING_LITERAL.sub('?', str(query))
+    text = _PLACEHOLDER.sub('?', text)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _VALUE_LIST.sub('(?, ...)', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+class QueryStats:
+    """Per-fingerprint latency histograms plus a bounded slow-query log.
+
+    Statements slower than ``slow_query_ms`` are logged; when
+    ``explain_sample_rate`` is above zero a sample of slow read statements
+    is re-run under ``EXPLAIN (ANALYZE, BUFFERS)`` and the plan is kept
+    with the log entry.
+    """
+
+    def __init__(self, slow_query_ms: float = 500, explain_sample_rate: float = 0.0,
+                 slow_log_size: int = 100, explain_interval: float = 60.0):
+        self.slow_query_ms = slow_query_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_interval = explain_interval
+        self._lock = threading.Lock()
+        self._statements: Dict[str, Dict] = {}
+        self._slow_log = deque(maxlen=slow_log_size)
+        self._last_explained: Dict[str, float] = {}
+        # Maps a prepared statement name to its text so EXECUTE can be classified
+        self.resolve_statement: Optional[Callable[[str], Optional[str]]] = None
+
+    @classmethod
+    def from_env(cls) -> 'QueryStats':
+        return cls(
+            slow_query_ms=float(os.environ.get('DB_SLOW_QUERY_MS', 500)),
+            explain_sample_rate=float(os.environ.get('DB_EXPLAIN_SAMPLE_RATE', 0)),
+            slow_log_size=int(os.environ.get('DB_SLOW_LOG_SIZE', 100))
+        )
+
+    def record(self, query, duration: float, rows: int = 0, pool_wait: float = 0.0) -> str:
+        """Record one execution; duration and pool_wait are in seconds"""
+        key = fingerprint(query)
+        duration_ms = duration * 1000
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is None:
+                entry = self._statements[key] = {
+                    'calls': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'rows': 0,
+                    'pool_wait_ms': 0.0,
+                    'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1)
+                }
+            entry['calls'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['rows'] += max(rows, 0)
+            entry['pool_wait_ms'] += pool_wait * 1000
+            entry['buckets'][bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+        return key
+
+    def should_explain(self, key: str, query) -> bool:
+        """Decide whether a slow statement gets an EXPLAIN ANALYZE sample"""
+        if self.explain_sample_rate <= 0 or random.random() >= self.explain_sample_rate:
+            return False
+        # ANALYZE runs the statement again, so only sample reads
+        words = key.lstrip('(').split(' ', 2)
+        if words[0].upper() == 'EXECUTE':
+            name = words[1].split('(', 1)[0] if len(words) > 1 else ''
+            query = self.resolve_statement(name) if self.resolve_statement else None
+            if not query:
+                return False
+        if not is_read_query(query):
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_explained.get(key, float('-inf')) < self.explain_interval:
+                return False
+            self._last_explained[key] = now
+        return True
+
+    def log_slow(self, key: str, duration: float, rows: int, plan: Optional[str] = None) -> None:
+        duration_ms = round(duration * 1000, 2)
+        logger.warning(f"Slow query ({duration_ms} ms, {rows} rows): {key[:500]}")
+        with self._lock:
+            self._slow_log.append({
+                'fingerprint': key,
+                'duration_ms': duration_ms,
+                'rows': rows,
+                'at': time.time(),
+                'plan': plan
+            })
+
+    @staticmethod
+    def _percentile(buckets: List[int], calls: int, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile"""
+        threshold = calls * fraction
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS + (None,), buckets):
+            seen += count
+            if seen >= threshold:
+                return bound
+        return None
+
+    def summary(self, limit: Optional[int] = None) -> Dict:
+        """Statements ordered by total time, with the recent slow-query log"""
+        with self._lock:
+            statements = []
+            for key, entry in self._statements.items():
+                calls = entry['calls']
+                statements.append({
+                    'fingerprint': key,
+                    'calls': calls,
+                    'total_ms': round(entry['total_ms'], 2),
+                    'avg_ms': round(entry['total_ms'] / calls, 2),
+                    'max_ms': round(entry['max_ms'], 2),
+                    'p50_ms': self._percentile(entry['buckets'], calls, 0.50),
+                    'p95_ms': self._percentile(entry['buckets'], calls, 0.95),
+                    'p99_ms': self._percentile(entry['buckets'], calls, 0.99),
+                    'rows': entry['rows'],
+                    'pool_wait_ms': round(entry['pool_wait_ms'], 2),
+                    'histogram': dict(zip(
+                        [f"le_{bound}" for bound in LATENCY_BUCKETS_MS] + ['gt_max'],
+                        entry['buckets']
+                    ))
+                })
+            slow_queries = list(self._slow_log)
+        statements.sort(key=lambda s: s['total_ms'], reverse=True)
+        return {
+            'slow_query_ms': self.slow_query_ms,
+            'statements': statements[:limit] if limit else statements,
+            'slow_queries': slow_queries
+        }
+
+    def export_json(self, path: Optional[str] = None, limit: Optional[int] = None) -> str:
+        """Serialize the summary as JSON, writing it to path when given"""
+        payload = json.dumps(self.summary(limit), indent=2, default=str)
+        if path:
+            with open(path, 'w') as f:
+                f.write(payload)
+        return payload
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._slow_log.clear()
+            self._last_explained.clear()
+
+class InstrumentedCursorMixin:
+    """Times execute() on a psycopg2 cursor and reports it to QueryStats.
+
+    Combined with the requested cursor class by instrumented_cursor_class;
+    the pool wait recorded for the checkout is charged to the first statement.
+    """
+
+    query_stats: Optional[QueryStats] = None
+    pending_pool_wait = 0.0
+
+    def execute(self, query, vars=None):
+        stats = self.query_stats
+        if stats is None:
+            return super().execute(query, vars)
+
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            duration = time.perf_counter() - started
+            pool_wait, self.pending_pool_wait = self.pending_pool_wait, 0.0
+            rows = self.rowcount
+            key = stats.record(query, duration, rows, pool_wait)
+            if duration * 1000 >= stats.slow_query_ms:
+                plan = None
+                if stats.should_explain(key, query):
+                    plan = self._explain(query, vars)
+                stats.log_slow(key, duration, rows, plan)
+
+    def _explain(self, query, vars) -> Optional[str]:
+        """Re-run a statement under EXPLAIN on a separate cursor of the same connection"""
+        try:
+            if self.connection.get_transaction_status() > 2:
+                # Failed transaction; nothing more can run on it
+                return None
+            with self.connection.cursor() as cur:
+                cur.execute("SAVEPOINT query_stats_explain")
+                try:
+                    if isinstance(query, bytes):
+                        query = query.decode()
+                    cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, vars)
+                    return "\n".join(row[0] for row in cur.fetchall())
+                finally:
+                    cur.execute("ROLLBACK TO SAVEPOINT query_stats_explain")
+        except Exception as e:
+            logger.warning(f"Could not capture query plan: {str(e)}")
+            return None
+
+_cursor_classes: Dict[type, type] = {}
+
+def instrumented_cursor_class(base: type) -> type:
+    """Get (and cache) an instrumented subclass of a psycopg2 cursor class"""
+    cls = _cursor_classes.get(base)
+    if cls is None:
+        cls = _cursor_classes[base] = type(
+            f"Instrumented{base.__name__}", (InstrumentedCursorMixin, base), {}
+        )
+    return cls
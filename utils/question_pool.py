@@ -0,0 +1,171 @@
+import random
+import threading
+import time
+import logging
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class QuestionIndex:
+    """Interview question ids bucketed by every filter the practice page uses.
+
+    Every question in the bank is indexed, so filters always see all
+    matches, but at most max_rows full rows are held in memory (a uniform
+    reservoir sample). Sampled ids outside it are loaded with fetch.
+    A random sample of k questions costs O(k) whatever the size of the bank.
+    """
+
+    def __init__(self, questions: Iterable[Dict], max_rows: Optional[int] = None,
+                 fetch: Optional[Callable[[List[int]], Iterable[Dict]]] = None):
+        self.fetch = fetch
+        self.rows: Dict[int, Dict] = {}
+        self.tags: Dict[int, frozenset] = {}
+        self.by_filter: Dict[tuple, List[int]] = {}
+        self.by_level: Dict[str, List[int]] = {}
+        self.by_skill: Dict[str, List[int]] = {}
+        slots: List[int] = []
+        self.size = 0
+        for question in questions:
+            qid = question['id']
+            category, difficulty = question.get('category'), question.get('difficulty')
+            # None stands for "any", so every category/difficulty combination is one lookup
+            for key in {(None, None), (category, None), (None, difficulty), (category, difficulty)}:
+                self.by_filter.setdefault(key, []).append(qid)
+            if question.get('experience_level'):
+                self.by_level.setdefault(question['experience_level'], []).append(qid)
+            tags = frozenset(question.get('skill_tags') or [])
+            if tags:
+                self.tags[qid] = tags
+            for tag in tags:
+                self.by_skill.setdefault(tag, []).append(qid)
+
+            # Reservoir sampling keeps a uniform subset of the full rows
+            if max_rows is None or len(slots) < max_rows:
+                slots.append(qid)
+                self.rows[qid] = question
+            else:
+                j = random.randint(0, self.size)
+                if j < max_rows:
+                    del self.rows[slots[j]]
+                    slots[j] = qid
+                    self.rows[qid] = question
+            self.size += 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def truncated(self) -> bool:
+        return len(self.rows) < self.size
+
+    def materialize(self, ids: List[int]) -> List[Dict]:
+        """Full rows for ids, in order, loading any not held in memory"""
+        missing = [qid for qid in ids if qid not in self.rows]
+        fetched = {}
+        if missing and self.fetch is not None:
+            fetched = {row['id']: row for row in self.fetch(missing)}
+        return [dict(self.rows.get(qid) or fetched[qid])
+                for qid in ids if qid in self.rows or qid in fetched]
+
+    def sample(self, bucket: List[int], limit: Optional[int] = None) -> List[Dict]:
+        """Up to limit questions from a bucket in random order; all of them without a limit"""
+        if limit is None or limit >= len(bucket):
+            picked = random.sample(bucket, len(bucket))
+        else:
+            picked = random.sample(bucket, limit)
+        return self.materialize(picked)
+
+    def sample_by_skills(self, skills: Iterable[str], limit: Optional[int] = None) -> List[Dict]:
+        """Uniform sample of the questions tagged with any of the skills"""
+        skills = set(skills)
+        buckets = [self.by_skill[s] for s in skills if s in self.by_skill]
+        if not buckets:
+            return []
+        total = sum(len(b) for b in buckets)
+        largest = max(len(b) for b in buckets)
+        if limit is None or limit * 2 > largest:
+            union = list({qid for bucket in buckets for qid in bucket})
+            return self.sample(union, limit)
+
+        # Draw from the concatenated buckets and accept a question with
+        # probability 1/(number of requested skills it carries), which makes
+        # every question in the union equally likely without building it
+        chosen = {}
+        while len(chosen) < limit:
+            r = random.randrange(total)
+            for bucket in buckets:
+                if r < len(bucket):
+                    qid = bucket[r]
+                    break
+                r -= len(bucket)
+            matches = len(skills & self.tags[qid])
+            if qid not in chosen and random.random() * matches < 1:
+                chosen[qid] = None
+        return self.materialize(list(chosen))
+
+class QuestionPool:
+    """Interview questions sampled from memory and reloaded in the background.
+
+    The whole bank is indexed; banks larger than max_size keep only a
+    random subset of full rows in memory and fetch the rest by id.
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[Dict]], refresh_interval: float = 600,
+                 max_size: int = 10000, fetch: Optional[Callable[[List[int]], Iterable[Dict]]] = None):
+        self.loader = loader
+        self.fetch = fetch
+        self.refresh_interval = refresh_interval
+        self.max_size = max_size
+        self._index = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """Reload the questions from the loader and swap the new index in"""
+        started = time.monotonic()
+        index = QuestionIndex(self.loader(), self.max_size, self.fetch)
+        # Readers keep using the old index until this single assignment
+        self._index = index
+        logger.info(f"Question pool loaded {len(index)} questions "
+                    f"in {time.monotonic() - started:.2f}s")
+        if index.truncated:
+            logger.info(f"Question pool keeps {len(index.rows)} of {len(index)} questions in memory; "
+                        f"the rest are fetched by id when sampled")
+        return len(index)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            def worker():
+                while True:
+                    time.sleep(self.refresh_interval)
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        logger.error(f"Error refreshing question pool: {str(e)}")
+
+            self._thread = threading.Thread(target=worker, name='question-pool-refresh', daemon=True)
+            self._thread.start()
+
+    def index(self) -> QuestionIndex:
+        """The current index, loading it on first use"""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self.refresh()
+        return self._index
+
+    def sample(self, category: Optional[str] = None, difficulty: Optional[str] = None,
+               limit: Optional[int] = None) -> List[Dict]:
+        index = self.index()
+        return index.sample(index.by_filter.get((category, difficulty), []), limit)
+
+    def sample_by_skills(self, skills: Iterable[str], limit: Optional[int] = None) -> List[Dict]:
+        return self.index().sample_by_skills(skills, limit)
+
+    def sample_by_experience_level(self, experience_level: str,
+                                   limit: Optional[int] = None) -> List[Dict]:
+        index = self.index()
+        return index.sample(index.by_level.get(experience_level, []), limit)
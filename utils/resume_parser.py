@@ -0,0 +1,35 @@
+import logging
+from typing import Tuple, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def extract_pdf_text(source) -> str:
+    """Extract text from a PDF file path or binary stream"""
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(source)
+    return " ".join(page.extract_text() or "" for page in pdf_reader.pages)
+
+def extract_docx_text(source) -> str:
+    """Extract text from a DOCX file path or binary stream"""
+    from docx import Document
+    doc = Document(source)
+    return " ".join(paragraph.text for paragraph in doc.paragraphs)
+
+def extract_text(source, file_type: str) -> Tuple[Optional[str], Optional[str]]:
+    """Extract text from a resume file, returning (text, error)"""
+    try:
+        if file_type == 'pdf':
+            extracted_text = extract_pdf_text(source)
+        else:  # docx
+            extracted_text = extract_docx_text(source)
+
+        if not extracted_text.strip():
+            return None, f"Could not extract text from {file_type.upper()} file."
+
+        return extracted_text, None
+
+    except Exception as e:
+        logger.error(f"Error processing {file_type} file: {str(e)}")
+        return None, f"Error processing file: {str(e)}"
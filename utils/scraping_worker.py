@@ -2,6 +2,7 @@ import logging
 import threading
 import time
 from utils.job_scraper import JobScraper
+from utils.analytics_worker import refresh_analytics
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,7 +17,11 @@ def setup_scraping_worker():
         while True:
             try:
                 logger.info("Running job scraping cycle")
-                scraper.scrape_jobs()
+                new_job_ids = scraper.scrape_jobs()
+                logger.info(f"Scraping cycle inserted {len(new_job_ids)} new jobs")
+                if new_job_ids:
+                    # Bring the dashboard up to date with the new postings
+                    refresh_analytics()
             except Exception as e:
                 logger.error(f"Critical error in scraping worker: {str(e)}")
             finally:
@@ -0,0 +1,219 @@
+import os
+import shutil
+import logging
+import argparse
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from psycopg2.extras import RealDictCursor
+from utils.database import Database
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.environ.get('ANALYTICS_SNAPSHOT_DIR', 'snapshots')
+LATEST_FILE = '_LATEST'
+BATCH_SIZE = 50000
+# Serializes exports across every app process writing to the snapshot directory
+SNAPSHOT_LOCK_KEY = 'export_analytics_snapshots'
+
+# Each table is exported with a fixed schema and partitioned by month
+SNAPSHOT_TABLES = {
+    'jobs': {
+        'query': """
+            SELECT id, title, company, location, description, url, source_id,
+                   posted_at, created_at, to_char(posted_at, 'YYYY-MM') AS month
+            FROM jobs
+        """,
+        'schema': pa.schema([
+            ('id', pa.int64()),
+            ('title', pa.string()),
+            ('company', pa.string()),
+            ('location', pa.string()),
+            ('description', pa.string()),
+            ('url', pa.string()),
+            ('source_id', pa.int64()),
+            ('posted_at', pa.timestamp('us')),
+            ('created_at', pa.timestamp('us')),
+            ('month', pa.string())
+        ])
+    },
+    'job_matches': {
+        'query': """
+            SELECT id, user_id, job_id, match_score, is_notified, created_at,
+                   to_char(created_at, 'YYYY-MM') AS month
+            FROM job_matches
+        """,
+        'schema': pa.schema([
+            ('id', pa.int64()),
+            ('user_id', pa.int64()),
+            ('job_id', pa.int64()),
+            ('match_score', pa.float64()),
+            ('is_notified', pa.bool_()),
+            ('created_at', pa.timestamp('us')),
+            ('month', pa.string())
+        ])
+    },
+    'interview_responses': {
+        'query': """
+            SELECT id, user_id, question_id, response, ai_feedback, score, created_at,
+                   to_char(created_at, 'YYYY-MM') AS month
+            FROM interview_responses
+        """,
+        'schema': pa.schema([
+            ('id', pa.int64()),
+            ('user_id', pa.int64()),
+            ('question_id', pa.int64()),
+            ('response', pa.string()),
+            ('ai_feedback', pa.string()),
+            ('score', pa.int32()),
+            ('created_at', pa.timestamp('us')),
+            ('month', pa.string())
+        ])
+    }
+}
+
+def export_table(db: Database, table: str, output_dir: str = SNAPSHOT_DIR,
+                 batch_size: int = BATCH_SIZE) -> Dict:
+    """Stream one table into a new month-partitioned Parquet snapshot.
+
+    The snapshot is written to its own directory and only becomes the
+    latest once complete, so readers never see a partial export. The
+    previous snapshot is kept for readers still scanning it.
+    """
+    spec = SNAPSHOT_TABLES[table]
+    table_dir = os.path.join(output_dir, table)
+    # Timestamp first so ids sort by age; the suffix keeps same-second exports apart
+    snapshot_id = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    snapshot_path = os.path.join(table_dir, snapshot_id)
+    os.makedirs(snapshot_path)
+
+    started = time.monotonic()
+    rows = 0
+    for i, batch in enumerate(db.stream(spec['query'], batch_size=batch_size,
+                                        cursor_factory=RealDictCursor)):
+        arrow_batch = pa.Table.from_pylist(batch, schema=spec['schema'])
+        pq.write_to_dataset(
+            arrow_batch,
+            snapshot_path,
+            partition_cols=['month'],
+            basename_template=f"part-{i}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore'
+        )
+        rows += len(batch)
+
+    # Publish atomically, then drop snapshots older than the one it replaces
+    previous_id = read_latest(table_dir)
+    pointer = os.path.join(table_dir, LATEST_FILE)
+    with open(pointer + '.tmp', 'w') as f:
+        f.write(snapshot_id)
+    os.replace(pointer + '.tmp', pointer)
+    if previous_id:
+        for name in os.listdir(table_dir):
+            path = os.path.join(table_dir, name)
+            if name < previous_id and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    report = {'table': table, 'snapshot': snapshot_id, 'rows': rows,
+              'seconds': round(time.monotonic() - started, 2)}
+    logger.info(f"Exported {rows} {table} rows to {snapshot_path} in {report['seconds']}s")
+    return report
+
+def read_latest(table_dir: str) -> Optional[str]:
+    """The id of a table's published snapshot, or None if there is none"""
+    try:
+        with open(os.path.join(table_dir, LATEST_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def export_snapshots(tables: Optional[List[str]] = None, output_dir: str = SNAPSHOT_DIR) -> List[Dict]:
+    """Export the analytics tables to Parquet snapshots"""
+    db = Database()
+    reports = []
+    connection = db.get_connection()
+    locked = False
+    try:
+        with connection.cursor() as cur:
+            # Only one process exports at a time; the others skip this round
+            cur.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (SNAPSHOT_LOCK_KEY,))
+            locked = cur.fetchone()[0]
+        connection.commit()
+        if not locked:
+            logger.info("Analytics snapshots are already being exported, skipping")
+            return reports
+        for table in tables or SNAPSHOT_TABLES:
+            try:
+                reports.append(export_table(db, table, output_dir))
+            except Exception as e:
+                logger.error(f"Error exporting {table} snapshot: {str(e)}")
+        return reports
+    finally:
+        if locked:
+            try:
+                with connection.cursor() as cur:
+                    cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (SNAPSHOT_LOCK_KEY,))
+                connection.commit()
+            except Exception as e:
+                logger.error(f"Error releasing snapshot lock: {str(e)}")
+        db.return_connection(connection)
+
+def load_snapshot(table: str, columns: Optional[List[str]] = None,
+                  output_dir: str = SNAPSHOT_DIR, filter=None) -> Optional[pa.Table]:
+    """Read the latest snapshot of a table as an Arrow table, or None if there is none.
+
+    Only the requested columns are read from disk; a filter on month
+    skips whole partitions.
+    """
+    table_dir = os.path.join(output_dir, table)
+    snapshot_id = read_latest(table_dir)
+    if snapshot_id is None:
+        return None
+    dataset = ds.dataset(
+        os.path.join(table_dir, snapshot_id),
+        schema=SNAPSHOT_TABLES[table]['schema'],
+        format='parquet',
+        partitioning='hive'
+    )
+    return dataset.to_table(columns=columns, filter=filter)
+
+def get_snapshot_time(table: str, output_dir: str = SNAPSHOT_DIR) -> Optional[datetime]:
+    """When the latest snapshot of a table was taken"""
+    snapshot_id = read_latest(os.path.join(output_dir, table))
+    try:
+        return datetime.strptime(snapshot_id.split('-', 1)[0], '%Y%m%dT%H%M%S') if snapshot_id else None
+    except ValueError:
+        return None
+
+def setup_snapshot_worker(interval: int = 24 * 3600):
+    """
+    Set up the Parquet snapshot exporter to run periodically
+    """
+    def worker():
+        logger.info("Starting analytics snapshot worker")
+        while True:
+            try:
+                export_snapshots()
+            except Exception as e:
+                logger.error(f"Critical error in snapshot worker: {str(e)}")
+            finally:
+                time.sleep(interval)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    logger.info("Analytics snapshot worker initialized")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export analytics tables to Parquet snapshots")
+    parser.add_argument("--tables", nargs="+", choices=list(SNAPSHOT_TABLES),
+                        help="Tables to export (default: all)")
+    parser.add_argument("--output-dir", default=SNAPSHOT_DIR,
+                        help="Snapshot root directory")
+    args = parser.parse_args()
+    export_snapshots(args.tables, args.output_dir)